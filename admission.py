@@ -0,0 +1,125 @@
+"""쓰기 요청 입장 제어 (admission control).
+
+시험이 끝나는 순간처럼 제출이 한꺼번에 몰리면, 라우트마다 동시에 처리하는 요청 수를 제한하고
+나머지는 도착한 순서대로(FIFO) 기다리게 합니다. 정해진 시간 안에 차례가 오지 않거나 대기열이 가득 차면
+503 과 Retry-After 헤더로 돌려보냅니다. SQLite 잠금 시간 초과도 500 대신 같은 응답으로 바꿉니다.
+fetch 로 부르는 JSON 요청에는 JSON 을, 일반 폼 제출에는 다시 시도하라는 HTML 화면(busy.html)을 돌려줍니다.
+
+제한은 프로세스(워커) 단위입니다. 설정: ADMISSION_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_TIMEOUT_SEC
+"""
+import math
+import time
+import sqlite3
+import threading
+from collections import deque
+from functools import wraps
+
+from flask import current_app, render_template, request
+
+GATED_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+MAX_RETRY_AFTER_SEC = 30
+
+
+class AdmissionGate:
+    """동시 실행 수 limit 의 세마포어 + 최대 max_queue 명이 기다리는 공정(FIFO) 대기열."""
+
+    def __init__(self, limit, max_queue, timeout):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+        self._avg_service_sec = 0.1    # 처리 시간의 지수 이동 평균 (Retry-After 추정용)
+        self.rejected = 0
+
+    def acquire(self):
+        """차례가 오면 True, 대기열이 가득 찼거나 시간이 지나면 False."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return True
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                return False
+            turn = threading.Event()
+            self._waiters.append(turn)
+        if turn.wait(self.timeout):
+            return True
+        with self._lock:
+            if turn.is_set():   # 시간 초과와 동시에 자리를 넘겨받은 경우
+                return True
+            self._waiters.remove(turn)
+            self.rejected += 1
+            return False
+
+    def release(self, service_sec):
+        with self._lock:
+            self._avg_service_sec = 0.8 * self._avg_service_sec + 0.2 * service_sec
+            if self._waiters:
+                self._waiters.popleft().set()   # 자리를 다음 사람에게 그대로 넘김
+            else:
+                self._active -= 1
+
+    def retry_after(self):
+        """지금 줄을 선 요청들이 빠지는 데 걸릴 예상 시간(초)."""
+        with self._lock:
+            backlog = self._active + len(self._waiters)
+            seconds = backlog / self.limit * self._avg_service_sec
+        return max(1, min(MAX_RETRY_AFTER_SEC, math.ceil(seconds)))
+
+
+class AdmissionControl:
+    """라우트(endpoint)별 AdmissionGate 모음. create_app 이 app.extensions["admission"] 에 둡니다."""
+
+    def __init__(self, limit, max_queue, timeout):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.gates = {}
+
+    def gate(self, name):
+        with self._lock:
+            if name not in self.gates:
+                self.gates[name] = AdmissionGate(self.limit, self.max_queue, self.timeout)
+            return self.gates[name]
+
+
+def wants_json():
+    return request.is_json or request.accept_mimetypes.best == "application/json"
+
+
+def busy_response(retry_after):
+    headers = {"Retry-After": str(retry_after)}
+    if not wants_json():
+        return render_template("busy.html", retry_after=retry_after), 503, headers
+    body = {"status": "busy", "message": "요청이 많아 잠시 후 다시 시도합니다.", "retry_after": retry_after}
+    return body, 503, headers
+
+
+def _is_lock_error(error):
+    message = str(error)
+    return "locked" in message or "busy" in message
+
+
+def admission_controlled(view):
+    """쓰기 요청(POST 등)에만 라우트별 입장 제어를 겁니다."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method not in GATED_METHODS:
+            return view(*args, **kwargs)
+        gate = current_app.extensions["admission"].gate(request.endpoint)
+        if not gate.acquire():
+            return busy_response(gate.retry_after())
+        started = time.perf_counter()
+        try:
+            return view(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not _is_lock_error(e):
+                raise
+            current_app.logger.warning("DB 잠금 시간 초과 (%s): %s", request.endpoint, e)
+            return busy_response(gate.retry_after())
+        finally:
+            gate.release(time.perf_counter() - started)
+    return wrapper
@@ -1,63 +1,151 @@
 import os
+import time
 import random
+import secrets
 import json
 import sqlite3
 from contextlib import closing
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, Flask, current_app, render_template, request, redirect, url_for, session, flash, g
 
-# --- 앱 설정 ---
-app = Flask(__name__)
-app.secret_key = "change-me-for-production"
+import shards
+import admission
+import assembly
+import bank_cache
+import bulk_ops
+import textstore
+from config import DEV_SECRET_KEY, Config
 
-# --- 경로 및 DB 설정 ---
-BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DB_PATH = os.path.join(BASE_DIR, "data", "my_database.db")
+# 모든 화면 라우트는 이 블루프린트에 있고, 앱은 create_app() 으로 만듭니다.
+bp = Blueprint("main", __name__)
 
 # --- 데이터베이스 헬퍼 함수 ---
 def get_db():
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    return con
+    """공유 문제은행 DB 연결."""
+    con = sqlite3.connect(current_app.config["DB_PATH"])
+    return textstore.install(con)
+
+def current_learner():
+    return session.get("learner_id") or shards.DEFAULT_LEARNER
+
+def get_learner_db():
+    """현재 학습자의 샤드 연결 (문제은행이 bank 로 첨부되어 있음). with 문으로 사용합니다."""
+    return current_app.extensions["shard_pool"].connection(current_learner())
+
+@bp.app_context_processor
+def inject_learner():
+    return {"current_learner": current_learner()}
+
+def load_questions_with_choices(con, qids):
+    """주어진 순서대로 문제와 선택지를 불러옵니다. (문제 수와 상관없이 쿼리 2번)"""
+    if not qids:
+        return []
+    placeholders = ",".join("?" * len(qids))
+    cur = con.cursor()
+    cur.execute(f"SELECT * FROM Question WHERE question_id IN ({placeholders})", qids)
+    questions = {q["question_id"]: q for q in cur.fetchall()}
+    cur.execute(f"SELECT * FROM Choice WHERE question_id IN ({placeholders}) ORDER BY choice_id", qids)
+    choices_by_qid = {}
+    for c in cur.fetchall():
+        choices_by_qid.setdefault(c["question_id"], []).append(c)
+    questions_with_choices = []
+    for qid in qids:
+        if qid not in questions:
+            continue
+        choices = choices_by_qid.get(qid, [])
+        questions_with_choices.append({
+            "question": questions[qid],
+            "choices": choices,
+            "correct_answer_count": sum(1 for c in choices if c["is_correct"])
+        })
+    return questions_with_choices
+
+def render_exam(questions_with_choices):
+    """시험지를 보여주고, 이 시험지의 제출 토큰을 세션에 새로 발급합니다. (중복 채점 방지)"""
+    session["current_exam"] = [q_wc["question"]["question_id"] for q_wc in questions_with_choices]
+    session["submit_token"] = secrets.token_urlsafe(16)
+    labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
+    return render_template("exam.html", questions_data=questions_with_choices, labels=labels,
+                           submit_token=session["submit_token"])
+
+def parse_blueprint(form):
+    """시험 설정 폼에서 출제 설계를 읽습니다. 사용하지 않으면 None."""
+    if not form.get("use_blueprint"):
+        return None
+    quotas = {}
+    for topic, count in zip(form.getlist("quota_topic"), form.getlist("quota_count")):
+        try:
+            quotas[topic] = max(0, int(count))
+        except ValueError:
+            continue
+    return {
+        "quotas": quotas,
+        "bands": [b for b in form.getlist("bands") if b in assembly.ALL_BANDS] or list(assembly.ALL_BANDS),
+        "exclude_recent": bool(form.get("exclude_recent")),
+        "exclude_errors": bool(form.get("exclude_errors")),
+        "min_multi": form.get("min_multi", 0, type=int) or 0
+    }
+
+def build_question_filter(search_query, selected_topic, selected_tag):
+    """/manage 검색 조건을 WHERE 절과 파라미터로 만듭니다. (Question 테이블 별칭은 Q)"""
+    params = []
+    where_clauses = []
+    if search_query:
+        where_clauses.append(textstore.plain_sql("Q.question_text") + " LIKE ?")
+        params.append(f"%{search_query}%")
+    if selected_topic:
+        where_clauses.append("Q.topic = ?")
+        params.append(selected_topic)
+    if selected_tag:
+        where_clauses.append("Q.tags LIKE ?")
+        params.append(f"%{selected_tag}%")
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    return where_sql, params
 
 def get_structured_topics():
-    structured_data = {}
     with closing(get_db()) as con:
-        cur = con.cursor()
-        cur.execute("SELECT DISTINCT subject FROM Question ORDER BY subject")
-        subjects = [r["subject"] for r in cur.fetchall()]
-        for subject in subjects:
-            cur.execute("SELECT DISTINCT topic FROM Question WHERE subject = ? ORDER BY topic", (subject,))
-            topics = [r["topic"] for r in cur.fetchall()]
-            structured_data[subject] = topics
-    return structured_data
+        return bank_cache.get_topic_tree(con, current_app.config["DB_PATH"])
 
 # --- 시험 관련 라우트 ---
-@app.route("/", methods=["GET", "POST"])
+@bp.route("/", methods=["GET", "POST"])
 def index():
     structured_topics = get_structured_topics()
-    question_counts_by_topic = {}
     with closing(get_db()) as con:
-        cur = con.cursor()
-        cur.execute("SELECT topic, COUNT(*) as count FROM Question GROUP BY topic")
-        rows = cur.fetchall()
-        for row in rows:
-            key = row['topic'] if row['topic'] is not None else '기타'
-            question_counts_by_topic[key] = row['count']
+        question_counts_by_topic = bank_cache.get_topic_counts(con, current_app.config["DB_PATH"])
     question_counts_json = json.dumps(question_counts_by_topic)
     if request.method == "POST":
         session["filters"] = {
             "topics": request.form.getlist("topics"),
             "num_q": int(request.form.get("num_questions") or 5),
-            "session_name": request.form.get("session_name") or "이름 없는 시험"
+            "session_name": request.form.get("session_name") or "이름 없는 시험",
+            "blueprint": parse_blueprint(request.form)
         }
-        return redirect(url_for("start_exam"))
+        return redirect(url_for(".start_exam"))
     return render_template("index.html",
                            structured_topics=structured_topics,
-                           question_counts_json=question_counts_json)
+                           question_counts_json=question_counts_json,
+                           band_labels=assembly.BAND_LABELS)
+
+def start_blueprint_exam(blueprint):
+    """출제 설계에 맞춰 미리 만들어 둔 후보 풀에서 문제를 고릅니다."""
+    with closing(get_db()) as con:
+        index = assembly.get_question_index(con, current_app.config["DB_PATH"])
+    learner = current_learner()
+    with get_learner_db() as con:
+        profile = assembly.get_learner_profile(con, shards.shard_path(current_app.config["SHARD_DIR"], learner))
+    qids, shortfall = assembly.assemble_exam(index, profile, blueprint)
+    missing_multi = shortfall.pop("min_multi", 0)
+    if shortfall:
+        flash(f"조건에 맞는 문제가 부족해 {sum(shortfall.values())}문항을 채우지 못했습니다.", "warning")
+    if missing_multi:
+        flash(f"복수 정답 문항이 {missing_multi}개 부족합니다.", "warning")
+    with closing(get_db()) as con:
+        return load_questions_with_choices(con, qids)
 
-@app.route("/start")
+@bp.route("/start")
 def start_exam():
     filters = session.get("filters", {"topics": [], "num_q": 5})
+    if filters.get("blueprint"):
+        return render_exam(start_blueprint_exam(filters["blueprint"]))
     topics = filters.get("topics", [])
     num_q = int(filters.get("num_q", 5))
     query = "SELECT * FROM Question"
@@ -83,86 +171,84 @@ def start_exam():
                 "choices": choices,
                 "correct_answer_count": correct_answer_count
             })
-    session["current_exam"] = [q_wc["question"]["question_id"] for q_wc in questions_with_choices]
-    labels = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
-    return render_template("exam.html", questions_data=questions_with_choices, labels=labels)
+    return render_exam(questions_with_choices)
+
+def submit_redirect(endpoint, **values):
+    """exam.html 의 fetch 제출(Accept: application/json)에는 이동할 주소를 JSON 으로, 일반 폼 제출에는 302 로 답합니다."""
+    location = url_for(endpoint, **values)
+    if request.accept_mimetypes.best == "application/json":
+        return {"location": location}
+    return redirect(location)
 
-@app.route("/submit", methods=["POST"])
+@bp.route("/submit", methods=["POST"])
+@admission.admission_controlled
 def submit_exam():
+    """채점 후 결과 화면으로 보냅니다. (POST/Redirect/GET)
+
+    같은 제출 토큰으로 다시 들어온 요청(재시도, 중복 클릭)은 채점하지 않고 처음 만든 기록으로 보냅니다.
+    """
     qids = session.get("current_exam", [])
-    if not qids:
-        return redirect(url_for("index"))
-    user_answers = {}
-    for qid in qids:
-        key = f"q_{qid}"
-        user_answers[qid] = [int(val) for val in request.form.getlist(key)]
-    results = []
-    score = 0
-    with closing(get_db()) as con:
+    token = request.form.get("submit_token") or session.get("submit_token")
+    with closing(get_db()) as bank:
+        answer_keys = bank_cache.get_answer_keys(bank, current_app.config["DB_PATH"])
+    with get_learner_db() as con:
+        cur = con.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        if token:
+            cur.execute("SELECT session_id FROM SubmissionToken WHERE token = ?", (token,))
+            row = cur.fetchone()
+            if row:
+                con.rollback()
+                return submit_redirect(".history_detail", session_id=row["session_id"])
+        if not qids or token != session.get("submit_token"):
+            con.rollback()
+            flash("제출할 시험지를 찾을 수 없습니다. 새 시험을 시작해주세요.", "warning")
+            return submit_redirect(".index")
+
+        cur.execute(f"SELECT question_id FROM Question WHERE question_id IN ({','.join('?' * len(qids))})", qids)
+        existing = {row["question_id"] for row in cur.fetchall()}
+        answers = []
         for qid in qids:
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Question WHERE question_id = ?", (qid,))
-            question_row = cur.fetchone()
-            cur.execute("SELECT * FROM Choice WHERE question_id = ?", (qid,))
-            choices = cur.fetchall()
-            correct_choice_ids = [c["choice_id"] for c in choices if c["is_correct"]]
-            chosen_choice_ids = user_answers.get(qid, [])
-            is_correct = set(chosen_choice_ids) == set(correct_choice_ids)
-            if is_correct:
-                score += 1
-            else:
-                check_cur = con.cursor()
-                check_cur.execute("SELECT * FROM WrongAnswer WHERE question_id = ?", (qid,))
-                if not check_cur.fetchone():
-                    con.execute("INSERT INTO WrongAnswer (question_id) VALUES (?)", (qid,))
-                    con.commit()
+            if qid not in existing:
+                continue
+            chosen_choice_ids = [int(val) for val in request.form.getlist(f"q_{qid}")]
+            is_correct = set(chosen_choice_ids) == set(answer_keys.get(qid, ()))
             confidence_value = request.form.get(f"confidence_q_{qid}", -1, type=int)
-            con.execute(
-                "INSERT INTO AnswerLog (question_id, is_correct, confidence) VALUES (?, ?, ?)",
-                (qid, is_correct, confidence_value)
-            )
-            con.commit()
-            results.append({
-                "question": question_row,
-                "choices": choices,
-                "chosen": chosen_choice_ids,
-                "correct": correct_choice_ids,
-                "is_correct": is_correct,
-                "confidence": confidence_value
-            })
-        total = len(qids)
+            answers.append((qid, json.dumps(chosen_choice_ids), is_correct, confidence_value))
+
+        score = sum(1 for a in answers if a[2])
+        total = len(answers)
         percent = int(round(score * 100.0 / total)) if total else 0
         session_name = session.get("filters", {}).get("session_name", "이름 없는 시험")
-        session_cur = con.cursor()
-        session_cur.execute(
+        cur.execute(
             "INSERT INTO TestSession (session_name, score, total, percent) VALUES (?, ?, ?, ?)",
             (session_name, score, total, percent)
         )
-        session_id = session_cur.lastrowid
-        con.commit()
-        answer_cur = con.cursor()
-        for r in results:
-            qid = r["question"]["question_id"]
-            chosen_ids_json = json.dumps(r["chosen"])
-            answer_cur.execute(
-                """
-                INSERT INTO UserAnswer (session_id, question_id, chosen_choice_ids, is_correct, confidence)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (session_id, qid, chosen_ids_json, r["is_correct"], r["confidence"])
-            )
+        session_id = cur.lastrowid
+        cur.executemany(
+            """
+            INSERT INTO UserAnswer (session_id, question_id, chosen_choice_ids, is_correct, confidence)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(session_id,) + a for a in answers]
+        )
+        cur.executemany(
+            "INSERT INTO AnswerLog (question_id, is_correct, confidence) VALUES (?, ?, ?)",
+            [(qid, is_correct, confidence) for qid, _, is_correct, confidence in answers]
+        )
+        cur.executemany(
+            "INSERT INTO WrongAnswer (question_id) SELECT ? WHERE NOT EXISTS "
+            "(SELECT 1 FROM WrongAnswer WHERE question_id = ?)",
+            [(qid, qid) for qid, _, is_correct, _ in answers if not is_correct]
+        )
+        if token:
+            cur.execute("INSERT INTO SubmissionToken (token, session_id) VALUES (?, ?)", (token, session_id))
         con.commit()
-    return render_template(
-        "results.html",
-        results=results,
-        score=score,
-        total=total,
-        percent=percent,
-        session_id=session_id
-    )
+    return submit_redirect(".history_detail", session_id=session_id)
 
 # ... (add_question, manage, edit_question 등 다른 라우트들은 그대로 둡니다) ...
-@app.route("/add", methods=["GET", "POST"])
+@bp.route("/add", methods=["GET", "POST"])
+@admission.admission_controlled
 def add_question():
     """새로운 문제를 추가하는 페이지."""
     if request.method == "POST":
@@ -174,13 +260,15 @@ def add_question():
         answer_explanation = request.form.get("answer_explanation")
 
         with closing(get_db()) as con:
+            pack = textstore.packer(con)
             cur = con.cursor()
             cur.execute(
                 """
-                INSERT INTO Question (question_text, image_path, subject, topic, tags, answer_explanation)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO Question (question_text, question_preview, image_path, subject, topic, tags, answer_explanation)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (question_text, question_image_path, subject, topic, tags, answer_explanation)
+                (pack(question_text), textstore.preview(question_text), question_image_path,
+                 subject, topic, tags, pack(answer_explanation))
             )
             new_question_id = cur.lastrowid
             
@@ -200,17 +288,17 @@ def add_question():
                         INSERT INTO Choice (question_id, choice_text, image_path, is_correct)
                         VALUES (?, ?, ?, ?)
                         """,
-                        (new_question_id, choice_text, choice_image, is_correct)
+                        (new_question_id, pack(choice_text), choice_image, is_correct)
                     )
             
             con.commit()
 
         flash(f"새로운 문제 #{new_question_id}가 성공적으로 추가되었습니다.", "success")
-        return redirect(url_for("manage"))
+        return redirect(url_for(".manage"))
 
     return render_template("add_question.html")
 
-@app.route("/manage")
+@bp.route("/manage")
 def manage():
     """문제 관리 페이지 (검색, 주제, 태그 필터 및 우선순위 정렬)."""
     page = request.args.get('page', 1, type=int)
@@ -230,29 +318,14 @@ def manage():
         all_tags_raw = [row['tags'] for row in cur.fetchall()]
         all_tags = sorted(list(set(tag.strip() for tags in all_tags_raw for tag in tags.split(','))))
 
-        params = []
-        where_clauses = []
         base_query = "FROM Question Q LEFT JOIN Choice C ON Q.question_id = C.question_id"
-
-        if search_query:
-            where_clauses.append("Q.question_text LIKE ?")
-            params.append(f"%{search_query}%")
-        if selected_topic:
-            where_clauses.append("Q.topic = ?")
-            params.append(selected_topic)
-        if selected_tag:
-            where_clauses.append("Q.tags LIKE ?")
-            params.append(f"%{selected_tag}%")
-
-        where_sql = ""
-        if where_clauses:
-            where_sql = " WHERE " + " AND ".join(where_clauses)
+        where_sql, params = build_question_filter(search_query, selected_topic, selected_tag)
 
         count_query = "SELECT COUNT(DISTINCT Q.question_id) " + base_query + where_sql
         cur.execute(count_query, params)
         total_questions = cur.fetchone()[0]
 
-        main_query = "SELECT Q.*, COUNT(CASE WHEN C.is_correct = 1 THEN 1 END) as correct_answer_count " + base_query + where_sql
+        main_query = "SELECT Q.question_id, Q.question_preview, Q.topic, Q.tags, Q.has_error, COUNT(CASE WHEN C.is_correct = 1 THEN 1 END) as correct_answer_count " + base_query + where_sql
  
         main_query += """
             GROUP BY Q.question_id
@@ -275,13 +348,16 @@ def manage():
         current_page=page, 
         total_pages=total_pages,
         search_query=search_query,
+        total_questions=total_questions,
+        bulk_actions=bulk_ops.ACTIONS,
         all_topics=all_topics,
         all_tags=all_tags,
         selected_topic=selected_topic,
         selected_tag=selected_tag
     )
 
-@app.route("/edit/<int:question_id>", methods=["GET", "POST"])
+@bp.route("/edit/<int:question_id>", methods=["GET", "POST"])
+@admission.admission_controlled
 def edit_question(question_id):
     """개별 문제 수정 (이전/다음 문제 탐색 및 필터 유지 기능 추가)."""
     page = request.args.get('page', 1, type=int)
@@ -299,14 +375,16 @@ def edit_question(question_id):
             correct_choice_ids = request.form.getlist("correct_choices")
             question_image_path = request.form.get("question_image_path")
 
+            pack = textstore.packer(con)
             cur = con.cursor()
             cur.execute(
                 """
                 UPDATE Question 
-                SET question_text = ?, subject = ?, topic = ?, tags = ?, answer_explanation = ?, image_path = ?
+                SET question_text = ?, question_preview = ?, subject = ?, topic = ?, tags = ?, answer_explanation = ?, image_path = ?
                 WHERE question_id = ?
                 """,
-                (question_text, subject, topic, tags, answer_explanation, question_image_path, question_id)
+                (pack(question_text), textstore.preview(question_text), subject, topic, tags,
+                 pack(answer_explanation), question_image_path, question_id)
             )
             
             cur.execute("SELECT choice_id FROM Choice WHERE question_id = ?", (question_id,))
@@ -317,17 +395,17 @@ def edit_question(question_id):
 
             if correct_choice_ids:
                 correct_ids_int = [int(cid) for cid in correct_choice_ids]
-                cur.execute("UPDATE Choice SET is_correct = 0 WHERE question_id = ?", (question_id,))
-                
-                if correct_ids_int:
-                    placeholders = ','.join('?' for _ in correct_ids_int)
-                    query = f"UPDATE Choice SET is_correct = 1 WHERE choice_id IN ({placeholders})"
-                    cur.execute(query, correct_ids_int)
+                # 0으로 지웠다가 다시 켜지 않고 한 번에 바꿔, 정답이 그대로면 정답표 캐시도 그대로 둡니다.
+                placeholders = ','.join('?' for _ in correct_ids_int)
+                cur.execute(
+                    f"UPDATE Choice SET is_correct = (choice_id IN ({placeholders})) WHERE question_id = ?",
+                    correct_ids_int + [question_id]
+                )
             
             con.commit()
             flash(f"문제 #{question_id} 정보가 성공적으로 업데이트되었습니다.", "success")
             
-            return redirect(url_for("manage", page=page, q=search_query, topic=selected_topic, tag=selected_tag))
+            return redirect(url_for(".manage", page=page, q=search_query, topic=selected_topic, tag=selected_tag))
 
         cur = con.cursor()
         cur.execute("SELECT * FROM Question WHERE question_id = ?", (question_id,))
@@ -339,21 +417,8 @@ def edit_question(question_id):
         cur.execute("SELECT * FROM Choice WHERE question_id = ? ORDER BY choice_id", (question_id,))
         choices = cur.fetchall()
         
-        params = []
-        where_clauses = []
         base_query = "FROM Question Q LEFT JOIN Choice C ON Q.question_id = C.question_id"
-        
-        if search_query:
-            where_clauses.append("Q.question_text LIKE ?")
-            params.append(f"%{search_query}%")
-        if selected_topic:
-            where_clauses.append("Q.topic = ?")
-            params.append(selected_topic)
-        if selected_tag:
-            where_clauses.append("Q.tags LIKE ?")
-            params.append(f"%{selected_tag}%")
-
-        where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        where_sql, params = build_question_filter(search_query, selected_topic, selected_tag)
 
         ordered_query = """
             SELECT Q.question_id
@@ -393,41 +458,26 @@ def edit_question(question_id):
         }
     )
 
-@app.route("/start_review")
+@bp.route("/start_review")
 def start_review():
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         cur.execute("SELECT question_id FROM WrongAnswer")
         wrong_qids = [row['question_id'] for row in cur.fetchall()]
 
     if not wrong_qids:
         flash("복습할 오답 문제가 없습니다.", "info")
-        return redirect(url_for("index"))
+        return redirect(url_for(".index"))
 
-    questions_with_choices = []
+    # 삭제된 문제는 오답 목록에 남아 있어도 건너뜁니다.
     with closing(get_db()) as con:
-        for qid in wrong_qids:
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Question WHERE question_id = ?", (qid,))
-            q = cur.fetchone()
-            
-            choices_cur = con.cursor()
-            choices_cur.execute("SELECT * FROM Choice WHERE question_id = ?", (qid,))
-            choices = choices_cur.fetchall()
-
-            correct_answer_count = sum(1 for c in choices if c["is_correct"])
-
-            questions_with_choices.append({
-                "question": q,
-                "choices": choices,
-                "correct_answer_count": correct_answer_count
-            })
+        questions_with_choices = load_questions_with_choices(con, wrong_qids)
     
     random.shuffle(questions_with_choices)
-    session["current_exam"] = [q_wc["question"]["question_id"] for q_wc in questions_with_choices]
-    return render_template("exam.html", questions_data=questions_with_choices)
+    return render_exam(questions_with_choices)
 
-@app.route("/quick_edit/<int:question_id>", methods=["POST"])
+@bp.route("/quick_edit/<int:question_id>", methods=["POST"])
+@admission.admission_controlled
 def quick_edit(question_id):
     topic = request.form.get("topic")
     tags = request.form.get("tags")
@@ -442,28 +492,93 @@ def quick_edit(question_id):
     
     return {"status": "success", "message": "업데이트 완료"}
 
-@app.route("/report_error/<int:question_id>", methods=["POST"])
+@bp.route("/report_error/<int:question_id>", methods=["POST"])
+@admission.admission_controlled
 def report_error(question_id):
     with closing(get_db()) as con:
         cur = con.cursor()
-        cur.execute("SELECT has_error FROM Question WHERE question_id = ?", (question_id,))
-        current_status = cur.fetchone()['has_error']
-        new_status = not current_status
-        
+        # 읽고 나서 뒤집지 않고, UPDATE 한 번으로 토글합니다.
         cur.execute(
-            "UPDATE Question SET has_error = ? WHERE question_id = ?",
-            (new_status, question_id)
+            "UPDATE Question SET has_error = NOT COALESCE(has_error, 0) WHERE question_id = ? RETURNING has_error",
+            (question_id,)
         )
+        row = cur.fetchone()
         con.commit()
-    
-    return {"status": "success", "has_error": new_status}
 
+    if row is None:
+        return {"status": "error", "message": "문제를 찾을 수 없습니다."}, 404
+    return {"status": "success", "has_error": bool(row['has_error'])}
+
+@bp.route("/bulk_action", methods=["POST"])
+@admission.admission_controlled
+def bulk_action():
+    """여러 문제에 한 번에 작업을 적용합니다. (하나의 트랜잭션)
+
+    JSON 본문: {"action": ..., "value": ..., "question_ids": [...]}
+    또는 {"action": ..., "value": ..., "filters": {"q": ..., "topic": ..., "tag": ...}} 로 /manage 필터 결과 전체에 적용.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {"status": "error", "message": "JSON 객체를 보내주세요."}, 400
+    action = data.get("action")
+    if not isinstance(action, str) or action not in bulk_ops.ACTIONS:
+        return {"status": "error", "message": "알 수 없는 작업입니다."}, 400
+
+    with closing(get_db()) as con:
+        if data.get("filters") is not None:
+            filters = data["filters"]
+            if not isinstance(filters, dict) or not all(
+                isinstance(filters.get(key), (str, type(None))) for key in ("q", "topic", "tag")
+            ):
+                return {"status": "error", "message": "필터 형식이 올바르지 않습니다."}, 400
+            where_sql, params = build_question_filter(filters.get("q"), filters.get("topic"), filters.get("tag"))
+            cur = con.cursor()
+            cur.execute("SELECT Q.question_id FROM Question Q" + where_sql, params)
+            question_ids = [row['question_id'] for row in cur.fetchall()]
+        else:
+            try:
+                if not isinstance(data.get("question_ids", []), list):
+                    raise TypeError
+                question_ids = [int(qid) for qid in data.get("question_ids", [])]
+            except (TypeError, ValueError):
+                return {"status": "error", "message": "문제 번호가 올바르지 않습니다."}, 400
+        if not question_ids:
+            return {"status": "error", "message": "선택된 문제가 없습니다."}, 400
+
+        try:
+            results = bulk_ops.apply_bulk_action(con, action, question_ids, data.get("value"))
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}, 400
+
+    summary = {}
+    for status in results.values():
+        summary[status] = summary.get(status, 0) + 1
+    return {
+        "status": "success",
+        "summary": summary,
+        "results": {str(qid): status for qid, status in results.items()}
+    }
+
+
+# --- 학습자 관련 라우트 ---
+
+@bp.route("/learner", methods=["POST"])
+def switch_learner():
+    """현재 브라우저 세션의 학습자를 바꿉니다. 기록은 학습자별 샤드에 따로 저장됩니다."""
+    learner_id = shards.normalize_learner_id(request.form.get("learner_id"))
+    if not learner_id:
+        flash("학습자 이름은 1~40자의 글자, 숫자, '_', '-'만 사용할 수 있습니다.", "warning")
+        return redirect(url_for(".history_list"))
+    session["learner_id"] = learner_id
+    session.pop("current_exam", None)
+    flash(f"학습자 '{learner_id}'(으)로 전환했습니다.", "success")
+    return redirect(url_for(".history_list"))
 
 # --- 시험 기록 관련 라우트 ---
 
-@app.route("/review_wrong_answers/<int:session_id>")
+@bp.route("/review_wrong_answers/<int:session_id>")
 def review_wrong_answers(session_id):
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         cur.execute(
             "SELECT question_id FROM UserAnswer WHERE session_id = ? AND is_correct = 0",
@@ -472,37 +587,25 @@ def review_wrong_answers(session_id):
         wrong_qids = [row['question_id'] for row in cur.fetchall()]
     if not wrong_qids:
         flash("이 시험에서는 틀린 문제가 없습니다!", "info")
-        return redirect(url_for('history_detail', session_id=session_id))
-    questions_with_choices = []
+        return redirect(url_for('.history_detail', session_id=session_id))
+    # 삭제된 문제는 오답 기록에 남아 있어도 건너뜁니다.
     with closing(get_db()) as con:
-        for qid in wrong_qids:
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Question WHERE question_id = ?", (qid,))
-            q = cur.fetchone()
-            choices_cur = con.cursor()
-            choices_cur.execute("SELECT * FROM Choice WHERE question_id = ?", (qid,))
-            choices = choices_cur.fetchall()
-            correct_answer_count = sum(1 for c in choices if c["is_correct"])
-            questions_with_choices.append({
-                "question": q,
-                "choices": choices,
-                "correct_answer_count": correct_answer_count
-            })
+        questions_with_choices = load_questions_with_choices(con, wrong_qids)
     random.shuffle(questions_with_choices)
     session["current_exam"] = [q_wc["question"]["question_id"] for q_wc in questions_with_choices]
     session["filters"] = {
         "session_name": f"시험 #{session_id} 오답 복습"
     }
-    return redirect(url_for('start_exam'))
+    return redirect(url_for('.start_exam'))
 
-@app.route("/review_selected", methods=["POST"])
+@bp.route("/review_selected", methods=["POST"])
 def review_selected_sessions():
     selected_session_ids = request.form.getlist("session_ids")
     if not selected_session_ids:
         flash("복습할 시험을 하나 이상 선택해주세요.", "warning")
-        return redirect(url_for("history_list"))
+        return redirect(url_for(".history_list"))
     all_wrong_qids = set()
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         for session_id in selected_session_ids:
             cur.execute(
@@ -513,43 +616,31 @@ def review_selected_sessions():
             all_wrong_qids.update(wrong_qids_in_session)
     if not all_wrong_qids:
         flash("선택하신 시험에는 틀린 문제가 없습니다.", "info")
-        return redirect(url_for("history_list"))
-    questions_with_choices = []
+        return redirect(url_for(".history_list"))
+    # 삭제된 문제는 오답 기록에 남아 있어도 건너뜁니다.
     with closing(get_db()) as con:
-        for qid in all_wrong_qids:
-            cur = con.cursor()
-            cur.execute("SELECT * FROM Question WHERE question_id = ?", (qid,))
-            q = cur.fetchone()
-            choices_cur = con.cursor()
-            choices_cur.execute("SELECT * FROM Choice WHERE question_id = ?", (qid,))
-            choices = choices_cur.fetchall()
-            correct_answer_count = sum(1 for c in choices if c["is_correct"])
-            questions_with_choices.append({
-                "question": q,
-                "choices": choices,
-                "correct_answer_count": correct_answer_count
-            })
+        questions_with_choices = load_questions_with_choices(con, sorted(all_wrong_qids))
     random.shuffle(questions_with_choices)
     session["current_exam"] = [q_wc["question"]["question_id"] for q_wc in questions_with_choices]
     session_names = ", ".join([f"#{s_id}" for s_id in selected_session_ids])
     session["filters"] = {
         "session_name": f"시험 {session_names} 오답 복습"
     }
-    return redirect(url_for('start_exam'))
+    return redirect(url_for('.start_exam'))
 
-@app.route("/history")
+@bp.route("/history")
 def history_list():
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         cur.execute("SELECT * FROM TestSession ORDER BY timestamp DESC")
         sessions = cur.fetchall()
     return render_template("history.html", sessions=sessions)
 
-@app.route("/history/<int:session_id>")
+@bp.route("/history/<int:session_id>")
 def history_detail(session_id):
     results = []
     session_info = {}
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         cur.execute("SELECT * FROM TestSession WHERE session_id = ?", (session_id,))
         session_info = cur.fetchone()
@@ -563,28 +654,27 @@ def history_detail(session_id):
 
         cur.execute("SELECT * FROM UserAnswer WHERE session_id = ?", (session_id,))
         user_answers = cur.fetchall()
+        with closing(get_db()) as bank:
+            answer_keys = bank_cache.get_answer_keys(bank, current_app.config["DB_PATH"])
+        questions = {
+            q_wc["question"]["question_id"]: q_wc
+            for q_wc in load_questions_with_choices(con, [answer["question_id"] for answer in user_answers])
+        }
         for answer in user_answers:
             qid = answer["question_id"]
-            q_cur = con.cursor()
-            q_cur.execute("SELECT * FROM Question WHERE question_id = ?", (qid,))
-            question_row = q_cur.fetchone()
-            c_cur = con.cursor()
-            c_cur.execute("SELECT * FROM Choice WHERE question_id = ?", (qid,))
-            choices = c_cur.fetchall()
-            correct_choice_ids = [c["choice_id"] for c in choices if c["is_correct"]]
-            chosen_choice_ids = json.loads(answer["chosen_choice_ids"])
-            
+            if qid not in questions:   # 삭제된 문제
+                continue
             # ✨[수정] 결과 객체에 노트 정보 추가
             results.append({
-                "question": question_row,
-                "choices": choices,
-                "chosen": chosen_choice_ids,
-                "correct": correct_choice_ids,
+                "question": questions[qid]["question"],
+                "choices": questions[qid]["choices"],
+                "chosen": json.loads(answer["chosen_choice_ids"]),
+                "correct": list(answer_keys.get(qid, ())),
                 "is_correct": answer["is_correct"],
                 "confidence": answer["confidence"],
                 "note": notes_by_qid.get(qid, "") # 해당 문제의 노트를 전달
             })
-            
+
     return render_template(
         "results.html",
         results=results,
@@ -594,32 +684,36 @@ def history_detail(session_id):
         session_id=session_id # ✨[추가] 노트 저장을 위해 session_id 전달
     )
 
-@app.route("/history/edit/<int:session_id>", methods=["POST"])
+@bp.route("/history/edit/<int:session_id>", methods=["POST"])
+@admission.admission_controlled
 def edit_history(session_id):
     new_name = request.form.get("new_name")
     if not new_name:
         return {"status": "error", "message": "새로운 이름이 필요합니다."}, 400
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         cur.execute("UPDATE TestSession SET session_name = ? WHERE session_id = ?", (new_name, session_id))
         con.commit()
     flash(f"시험 #{session_id}의 이름이 '{new_name}'(으)로 변경되었습니다.", "success")
-    return redirect(url_for("history_list"))
+    return redirect(url_for(".history_list"))
 
-@app.route("/history/delete/<int:session_id>", methods=["POST"])
+@bp.route("/history/delete/<int:session_id>", methods=["POST"])
+@admission.admission_controlled
 def delete_history(session_id):
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         # ✨[추가] 관련 노트도 함께 삭제
         cur.execute("DELETE FROM UserNote WHERE session_id = ?", (session_id,))
         cur.execute("DELETE FROM UserAnswer WHERE session_id = ?", (session_id,))
+        cur.execute("DELETE FROM SubmissionToken WHERE session_id = ?", (session_id,))
         cur.execute("DELETE FROM TestSession WHERE session_id = ?", (session_id,))
         con.commit()
     flash(f"시험 #{session_id} 기록이 삭제되었습니다.", "success")
-    return redirect(url_for("history_list"))
+    return redirect(url_for(".history_list"))
 
 # ✨[추가] 노트 저장/업데이트를 위한 API 엔드포인트
-@app.route("/save_note", methods=["POST"])
+@bp.route("/save_note", methods=["POST"])
+@admission.admission_controlled
 def save_note():
     data = request.json
     session_id = data.get("session_id")
@@ -629,7 +723,7 @@ def save_note():
     if not all([session_id, question_id]):
         return {"status": "error", "message": "필요한 정보가 누락되었습니다."}, 400
 
-    with closing(get_db()) as con:
+    with get_learner_db() as con:
         cur = con.cursor()
         # 이미 노트가 있는지 확인 (UPSERT 기능 사용)
         cur.execute(
@@ -645,6 +739,76 @@ def save_note():
     
     return {"status": "success", "message": "노트가 저장되었습니다."}
 
+# --- 앱 생성 ---
+def warm_up(app):
+    """요청을 받기 전에 문제은행 캐시(주제 트리, 주제별 문제 수, 조립 색인, 정답표)를 채웁니다.
+
+    학습자 샤드는 열지 않으므로 gunicorn --preload 처럼 fork 전에 호출해도 안전합니다.
+    """
+    db_path = app.config["DB_PATH"]
+    with closing(sqlite3.connect(db_path)) as con:
+        con.row_factory = sqlite3.Row
+        bank_cache.get_topic_tree(con, db_path)
+        bank_cache.get_topic_counts(con, db_path)
+        bank_cache.get_answer_keys(con, db_path)
+        assembly.get_question_index(con, db_path)
+
+def _track_first_request(app, metrics):
+    """첫 요청의 지연 시간을 startup_metrics 에 기록합니다. (워커마다 한 번)"""
+    @app.before_request
+    def _first_request_start():
+        if "first_request_ms" not in metrics:
+            g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _first_request_end(response):
+        started = g.pop("request_started", None)
+        if started is not None and "first_request_ms" not in metrics:
+            metrics["first_request_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            metrics["first_request_path"] = request.path
+            app.logger.info("첫 요청 %s: %.1f ms", request.path, metrics["first_request_ms"])
+        return response
+
+def create_app(config=None):
+    """앱 팩토리. 설정 우선순위: Config < EXAM_* 환경 변수 < config 인자."""
+    started = time.perf_counter()
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.from_prefixed_env("EXAM")
+    app.config.update(config or {})
+    if not app.config["SECRET_KEY"]:
+        if not (app.debug or app.testing):
+            raise RuntimeError("SECRET_KEY 가 없습니다. EXAM_SECRET_KEY 환경 변수로 지정하세요.")
+        app.logger.warning("SECRET_KEY 가 없어 개발용 키를 씁니다. 운영에서는 EXAM_SECRET_KEY 를 지정하세요.")
+        app.config["SECRET_KEY"] = DEV_SECRET_KEY
+    app.register_blueprint(bp)
+    with closing(sqlite3.connect(app.config["DB_PATH"])) as con:
+        textstore.ensure_schema(con)
+        bank_cache.ensure_schema(con)
+    app.extensions["shard_pool"] = shards.ShardPool(
+        app.config["DB_PATH"], app.config["SHARD_DIR"], app.config["SHARD_POOL_SIZE"]
+    )
+    app.extensions["admission"] = admission.AdmissionControl(
+        app.config["ADMISSION_CONCURRENCY"], app.config["ADMISSION_QUEUE_SIZE"], app.config["ADMISSION_TIMEOUT_SEC"]
+    )
+
+    metrics = {"create_app_ms": round((time.perf_counter() - started) * 1000, 1), "warm_up_ms": None}
+    if app.config["WARM_UP"]:
+        warm_started = time.perf_counter()
+        warm_up(app)
+        metrics["warm_up_ms"] = round((time.perf_counter() - warm_started) * 1000, 1)
+    if app.config["MAINTENANCE_SCHEDULER"]:
+        import maintenance   # 필요할 때만 불러옵니다.
+        maintenance.start_scheduler(
+            app.config["DB_PATH"], app.config["SHARD_DIR"],
+            archive_dir=app.config["ARCHIVE_DIR"], backup_dir=app.config["BACKUP_DIR"]
+        )
+    app.extensions["startup_metrics"] = metrics
+    _track_first_request(app, metrics)
+    app.logger.info("앱 생성 %.1f ms, 워밍업 %s ms", metrics["create_app_ms"], metrics["warm_up_ms"])
+    return app
+
 # --- 앱 실행 ---
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # 리로더의 자식 프로세스(실제 서버)에서만 유지보수 스케줄러를 띄웁니다.
+    create_app({"DEBUG": True, "MAINTENANCE_SCHEDULER": os.environ.get("WERKZEUG_RUN_MAIN") == "true"}).run()
@@ -0,0 +1,239 @@
+"""출제 설계(blueprint) 기반 시험지 조립.
+
+문제은행을 한 번 읽어 주제별 후보 풀(QuestionIndex)을 만들어 두고,
+학습자의 정답률/최근 출제 기록(LearnerProfile)과 함께 메모리에서 바로 문제를 고릅니다.
+매 시험마다 ORDER BY RANDOM() 쿼리를 돌리지 않으므로 문제은행이 커져도 조립은 몇 ms 안에 끝납니다.
+
+출제 설계(blueprint)는 session에 그대로 저장할 수 있는 dict 입니다.
+    {
+        "quotas": {"정규화": 5, "트랜잭션": 3},   # 주제별 문항 수
+        "bands": ["easy", "medium", "hard", "new"],  # 허용할 난이도 구간
+        "exclude_recent": True,   # 최근 RECENT_SESSIONS회 시험에 나온 문제 제외
+        "exclude_errors": True,   # 오류 신고(has_error)된 문제 제외
+        "min_multi": 2            # 복수 정답 문항 최소 개수
+    }
+"""
+import random
+import threading
+from collections import OrderedDict
+
+from bank_cache import INDEX, cached, file_version
+
+# --- ⚙️ 설정 ---
+EASY_MIN_ACCURACY = 0.8    # 정답률이 이 이상이면 쉬움
+HARD_MAX_ACCURACY = 0.5    # 정답률이 이 미만이면 어려움
+RECENT_SESSIONS = 3
+PROFILE_CACHE_SIZE = 32    # 캐시해 둘 학습자 프로필 수 (LRU, 샤드 연결 풀 크기와 같게)
+REJECTION_TRIES = 8        # 후보 풀에서 무작위로 뽑을 때 문항당 재시도 횟수
+
+BAND_EASY, BAND_MEDIUM, BAND_HARD, BAND_NEW = "easy", "medium", "hard", "new"
+ALL_BANDS = (BAND_EASY, BAND_MEDIUM, BAND_HARD, BAND_NEW)
+BAND_LABELS = {BAND_EASY: "쉬움", BAND_MEDIUM: "보통", BAND_HARD: "어려움", BAND_NEW: "처음 보는 문제"}
+
+
+class QuestionIndex:
+    """문제은행의 조립용 색인: 주제별 문제 ID 목록, 복수 정답/오류 문제 집합."""
+
+    def __init__(self, rows):
+        self.by_topic = {}
+        self.multi_by_topic = {}
+        self.topic_of = {}
+        self.error_ids = set()
+        self.multi_ids = set()
+        for question_id, topic, has_error, correct_answer_count in rows:
+            self.by_topic.setdefault(topic, []).append(question_id)
+            self.topic_of[question_id] = topic
+            if has_error:
+                self.error_ids.add(question_id)
+            if correct_answer_count and correct_answer_count > 1:
+                self.multi_ids.add(question_id)
+                self.multi_by_topic.setdefault(topic, []).append(question_id)
+
+    @classmethod
+    def load(cls, con):
+        cur = con.execute(
+            """
+            SELECT Q.question_id, Q.topic, Q.has_error,
+                   COUNT(CASE WHEN C.is_correct = 1 THEN 1 END) AS correct_answer_count
+            FROM Question Q LEFT JOIN Choice C ON Q.question_id = C.question_id
+            GROUP BY Q.question_id
+            """
+        )
+        return cls(tuple(row) for row in cur)
+
+    def __len__(self):
+        return len(self.topic_of)
+
+
+class LearnerProfile:
+    """학습자 한 명의 문제별 정답률과 최근 출제 문제."""
+
+    def __init__(self, accuracy, recent_ids):
+        self.accuracy = accuracy        # question_id -> 정답률 (0.0 ~ 1.0)
+        self.recent_ids = recent_ids    # 최근 시험에 나온 question_id 집합
+        self._attempted_by_topic = None
+        self._attempted_index = None
+
+    @classmethod
+    def load(cls, con, recent_sessions=RECENT_SESSIONS):
+        """학습자 샤드 연결에서 읽습니다. 보관(archive)된 기록은 AnswerLogMonthly 집계로 함께 셉니다."""
+        cur = con.execute(
+            """
+            SELECT question_id, SUM(attempts), SUM(correct) FROM (
+                SELECT question_id, COUNT(*) AS attempts, SUM(is_correct) AS correct
+                FROM AnswerLog GROUP BY question_id
+                UNION ALL
+                SELECT question_id, SUM(attempts), SUM(correct)
+                FROM AnswerLogMonthly GROUP BY question_id
+            )
+            GROUP BY question_id
+            """
+        )
+        accuracy = {qid: (correct or 0) / attempts for qid, attempts, correct in cur if attempts}
+        cur = con.execute(
+            """
+            SELECT DISTINCT question_id FROM UserAnswer
+            WHERE session_id IN (SELECT session_id FROM TestSession ORDER BY session_id DESC LIMIT ?)
+            """,
+            (recent_sessions,)
+        )
+        return cls(accuracy, {row[0] for row in cur})
+
+    def band_of(self, question_id):
+        acc = self.accuracy.get(question_id)
+        if acc is None:
+            return BAND_NEW
+        if acc >= EASY_MIN_ACCURACY:
+            return BAND_EASY
+        if acc < HARD_MAX_ACCURACY:
+            return BAND_HARD
+        return BAND_MEDIUM
+
+    def attempted_by_topic(self, index):
+        """푼 적 있는 문제를 주제별로 묶은 목록. 'new'를 뺀 설계에서 작은 후보 풀로 씁니다."""
+        if self._attempted_index is not index:
+            grouped = {}
+            for qid in self.accuracy:
+                if qid in index.topic_of:
+                    grouped.setdefault(index.topic_of[qid], []).append(qid)
+            self._attempted_by_topic = grouped
+            self._attempted_index = index
+        return self._attempted_by_topic
+
+
+# --- 캐시 ---
+_cache_lock = threading.Lock()
+_profile_cache = OrderedDict()    # shard_path -> (version, LearnerProfile), 최근에 쓴 순서
+
+
+def get_question_index(con, db_path):
+    """문제은행 색인을 캐시에서 돌려줍니다. 주제/오류 표시/정답이 바뀌었으면 다시 만듭니다 (bank_cache.cached)."""
+    return cached("question_index", INDEX, QuestionIndex.load, con, db_path)
+
+
+def get_learner_profile(con, shard_file):
+    version = file_version(shard_file)
+    with _cache_lock:
+        entry = _profile_cache.get(shard_file)
+        if entry and entry[0] == version:
+            _profile_cache.move_to_end(shard_file)
+            return entry[1]
+    profile = LearnerProfile.load(con)
+    with _cache_lock:
+        _profile_cache[shard_file] = (version, profile)
+        _profile_cache.move_to_end(shard_file)
+        while len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return profile
+
+
+# --- 조립 ---
+def _sample(pool, k, is_ok, rng, taken):
+    """pool에서 is_ok를 만족하고 taken에 없는 문제를 최대 k개 뽑습니다.
+
+    풀이 크면 무작위 위치를 찍어 보는 방식(rejection sampling)으로 O(k)에 끝내고,
+    조건에 맞는 문제가 드물어 실패하면 그때만 전체를 걸러냅니다.
+    """
+    picked = []
+    if k <= 0 or not pool:
+        return picked
+    if len(pool) > 4 * k:
+        for _ in range(k * REJECTION_TRIES):
+            qid = pool[rng.randrange(len(pool))]
+            if qid not in taken and is_ok(qid):
+                taken.add(qid)
+                picked.append(qid)
+                if len(picked) == k:
+                    return picked
+    rest = [qid for qid in pool if qid not in taken and is_ok(qid)]
+    for qid in rng.sample(rest, min(k - len(picked), len(rest))):
+        taken.add(qid)
+        picked.append(qid)
+    return picked
+
+
+def assemble_exam(index, profile, blueprint, rng=None):
+    """출제 설계에 맞게 문제 ID 목록을 만듭니다.
+
+    반환값: (question_ids, shortfall) - shortfall은 후보가 모자라 채우지 못한 주제별 문항 수
+    (복수 정답 최소 개수를 못 채웠으면 "min_multi" 키에 모자란 수).
+    """
+    rng = rng or random.Random()
+    quotas = {topic: int(n) for topic, n in blueprint.get("quotas", {}).items() if int(n) > 0}
+    bands = set(blueprint.get("bands") or ALL_BANDS)
+    exclude_recent = blueprint.get("exclude_recent", False)
+    exclude_errors = blueprint.get("exclude_errors", True)
+    min_multi = int(blueprint.get("min_multi") or 0)
+
+    def is_ok(qid):
+        if exclude_errors and qid in index.error_ids:
+            return False
+        if exclude_recent and qid in profile.recent_ids:
+            return False
+        return profile.band_of(qid) in bands
+
+    if BAND_NEW in bands:
+        topic_pool = index.by_topic
+        multi_pool = index.multi_by_topic
+    else:
+        # 푼 적 있는 문제만 후보이므로 학습자 기록에서 바로 풀을 만듭니다.
+        topic_pool = profile.attempted_by_topic(index)
+        multi_pool = {
+            topic: [qid for qid in qids if qid in index.multi_ids]
+            for topic, qids in topic_pool.items()
+        }
+
+    taken = set()
+    picked_by_topic = {topic: [] for topic in quotas}
+
+    # 1) 복수 정답 문항을 주제별로 돌아가며 하나씩 배정합니다.
+    remaining_multi = min_multi
+    open_topics = [t for t in quotas if multi_pool.get(t)]
+    while remaining_multi > 0 and open_topics:
+        for topic in list(open_topics):
+            if remaining_multi == 0:
+                break
+            if len(picked_by_topic[topic]) >= quotas[topic]:
+                open_topics.remove(topic)
+                continue
+            got = _sample(multi_pool[topic], 1, is_ok, rng, taken)
+            if not got:
+                open_topics.remove(topic)
+                continue
+            picked_by_topic[topic].extend(got)
+            remaining_multi -= 1
+
+    # 2) 나머지 자리를 주제별 후보 풀에서 채웁니다.
+    shortfall = {}
+    for topic, quota in quotas.items():
+        need = quota - len(picked_by_topic[topic])
+        picked_by_topic[topic].extend(_sample(topic_pool.get(topic, []), need, is_ok, rng, taken))
+        if len(picked_by_topic[topic]) < quota:
+            shortfall[topic] = quota - len(picked_by_topic[topic])
+
+    if remaining_multi > 0:
+        shortfall["min_multi"] = remaining_multi
+
+    question_ids = [qid for qids in picked_by_topic.values() for qid in qids]
+    rng.shuffle(question_ids)
+    return question_ids, shortfall
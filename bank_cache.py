@@ -0,0 +1,155 @@
+"""문제은행에서 파생되는 읽기 전용 캐시: 주제 트리, 주제별 문제 수, 정답표 (assembly 의 조립 색인도 여기 씁니다).
+
+캐시는 종류별 버전 번호(BankVersion 테이블)를 키로 씁니다. 버전은 Question/Choice 트리거가 올리므로,
+다른 프로세스(워커, merge.py 등)가 써도 바뀌고, 해당 캐시에 영향을 주는 열이 바뀔 때만 올라갑니다.
+예) 오류 신고는 조립 색인만, 정답 수정은 정답표와 조립 색인만 다시 만들게 합니다.
+
+같은 캐시를 여러 스레드가 동시에 다시 만들지 않도록 키마다 잠금을 둡니다. 이전 값이 있으면
+다른 스레드는 기다리지 않고 이전 값을 씁니다(정답표는 채점에 쓰이므로 기다립니다).
+create_app 이 ensure_schema 를 호출하고 워밍업에서 미리 채워 둡니다.
+"""
+import os
+import sqlite3
+import threading
+
+TOPICS, ANSWERS, INDEX = "topics", "answers", "index"
+
+VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS BankVersion (
+    kind TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO BankVersion (kind) VALUES ('topics'), ('answers'), ('index');
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_question_insert AFTER INSERT ON Question
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('topics', 'index');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_question_delete AFTER DELETE ON Question
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('topics', 'index');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_question_topic AFTER UPDATE OF subject, topic ON Question
+WHEN NEW.subject IS NOT OLD.subject OR NEW.topic IS NOT OLD.topic
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('topics', 'index');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_question_error AFTER UPDATE OF has_error ON Question
+WHEN NEW.has_error IS NOT OLD.has_error
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind = 'index';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_choice_insert AFTER INSERT ON Choice
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('answers', 'index');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_choice_delete AFTER DELETE ON Choice
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('answers', 'index');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_bank_version_choice_update AFTER UPDATE OF question_id, is_correct ON Choice
+WHEN NEW.question_id IS NOT OLD.question_id OR NEW.is_correct IS NOT OLD.is_correct
+BEGIN
+    UPDATE BankVersion SET version = version + 1 WHERE kind IN ('answers', 'index');
+END;
+"""
+
+_cache_lock = threading.Lock()
+_cache = {}    # (db_path, 이름) -> (version, 값)
+_build_locks = {}    # (db_path, 이름) -> 다시 만드는 중인 스레드가 잡는 잠금
+
+
+def file_version(path):
+    """DB 파일(및 WAL 파일)의 수정 시각. 다른 프로세스가 써도 바뀌므로 캐시 무효화 키로 씁니다."""
+    version = []
+    for p in (path, path + "-wal"):
+        try:
+            version.append(os.stat(p).st_mtime_ns)
+        except OSError:
+            version.append(0)
+    return tuple(version)
+
+
+def ensure_schema(con):
+    """문제은행에 BankVersion 테이블과 버전 트리거를 만듭니다."""
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Question'").fetchone():
+        return   # 아직 초기화하지 않은 DB
+    con.executescript(VERSION_SCHEMA)
+    con.commit()
+
+
+def bank_version(con, db_path, kind):
+    """kind 캐시의 현재 버전. BankVersion 이 없는 DB 면 파일 수정 시각으로 대신합니다."""
+    try:
+        row = con.execute("SELECT version FROM BankVersion WHERE kind = ?", (kind,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return (kind, row[0]) if row else file_version(db_path)
+
+
+def cached(name, kind, loader, con, db_path, wait=False):
+    """버전이 같으면 캐시된 값을, 바뀌었으면 loader(con) 로 다시 만든 값을 돌려줍니다.
+
+    다른 스레드가 이미 다시 만드는 중이면 이전 값을 돌려주고, 이전 값이 없거나 wait=True 면 기다립니다.
+    """
+    version = bank_version(con, db_path, kind)
+    key = (db_path, name)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry[0] == version:
+            return entry[1]
+        lock = _build_locks.setdefault(key, threading.Lock())
+    if entry and not wait:
+        if not lock.acquire(blocking=False):
+            return entry[1]
+    else:
+        lock.acquire()
+    try:
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry and entry[0] == version:   # 기다리는 동안 다른 스레드가 만들어 둠
+                return entry[1]
+        value = loader(con)
+        with _cache_lock:
+            _cache[key] = (version, value)
+        return value
+    finally:
+        lock.release()
+
+
+def load_topic_tree(con):
+    """{과목: [주제, ...]} (과목/주제 모두 이름순)."""
+    tree = {}
+    for subject, topic in con.execute("SELECT DISTINCT subject, topic FROM Question ORDER BY subject, topic"):
+        tree.setdefault(subject, []).append(topic)
+    return tree
+
+
+def load_topic_counts(con):
+    """{주제: 문제 수}. 주제가 없는 문제는 '기타' 로 셉니다."""
+    counts = {}
+    for topic, count in con.execute("SELECT topic, COUNT(*) FROM Question GROUP BY topic"):
+        key = topic if topic is not None else '기타'
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def load_answer_keys(con):
+    """{question_id: (정답 choice_id, ...)}."""
+    keys = {}
+    for qid, choice_id in con.execute(
+        "SELECT question_id, choice_id FROM Choice WHERE is_correct ORDER BY question_id, choice_id"
+    ):
+        keys.setdefault(qid, []).append(choice_id)
+    return {qid: tuple(ids) for qid, ids in keys.items()}
+
+
+def get_topic_tree(con, db_path):
+    return cached("topic_tree", TOPICS, load_topic_tree, con, db_path)
+
+
+def get_topic_counts(con, db_path):
+    return cached("topic_counts", TOPICS, load_topic_counts, con, db_path)
+
+
+def get_answer_keys(con, db_path):
+    return cached("answer_keys", ANSWERS, load_answer_keys, con, db_path, wait=True)
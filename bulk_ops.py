@@ -0,0 +1,152 @@
+"""문제 일괄 편집 (/manage 페이지의 일괄 작업).
+
+모든 작업은 BEGIN IMMEDIATE 로 시작한 하나의 트랜잭션에서 실행되고 한 번만 커밋합니다.
+결과는 문제별 상태 dict 로 돌려줍니다.
+    ok        : 변경됨
+    unchanged : 이미 원하는 상태라 바꿀 것이 없음
+    not_found : 문제가 없음
+    invalid   : 이 문제에는 적용할 수 없음 (예: 없는 선택지를 정답으로 지정)
+"""
+LABELS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
+ACTIONS = {
+    "set_topic": "주제 변경",
+    "clear_topic": "주제 비우기",
+    "add_tag": "태그 추가",
+    "remove_tag": "태그 제거",
+    "flag_error": "오류 표시",
+    "unflag_error": "오류 해제",
+    "set_correct": "정답 지정",
+    "delete": "삭제",
+}
+CHUNK_SIZE = 500   # IN (...) 목록 한 번에 넣을 ID 수 (SQLite 변수 개수 제한 대비)
+
+
+def _chunks(ids):
+    for i in range(0, len(ids), CHUNK_SIZE):
+        yield ids[i:i + CHUNK_SIZE]
+
+
+def _in_clause(ids):
+    return ",".join("?" * len(ids))
+
+
+def split_tags(tags):
+    return [t.strip() for t in (tags or "").split(",") if t.strip()]
+
+
+def parse_correct_labels(value):
+    """'A,C' 또는 'a c' 형태의 정답 표기를 0부터 시작하는 선택지 위치 목록으로 바꿉니다."""
+    positions = []
+    for token in (value or "").replace(",", " ").split():
+        label = token.strip().upper()
+        if label not in LABELS:
+            raise ValueError(f"정답은 {LABELS[0]}~{LABELS[-1]} 중에서 골라야 합니다: {token}")
+        positions.append(LABELS.index(label))
+    if not positions:
+        raise ValueError("정답으로 지정할 선택지를 입력해주세요.")
+    return sorted(set(positions))
+
+
+def apply_bulk_action(con, action, question_ids, value=None):
+    """question_ids 에 action 을 한 트랜잭션으로 적용하고 {question_id: 상태} 를 돌려줍니다.
+
+    value 가 잘못되면 아무것도 바꾸지 않고 ValueError 를 냅니다.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"알 수 없는 작업입니다: {action}")
+    if value is not None and not isinstance(value, str):
+        raise ValueError("값은 문자열이어야 합니다.")
+    value = (value or "").strip()
+    if action == "set_topic" and not value:
+        raise ValueError("바꿀 주제를 입력해주세요. (주제를 지우려면 '주제 비우기'를 사용하세요)")
+    if action in ("add_tag", "remove_tag"):
+        if not value or "," in value:
+            raise ValueError("태그는 쉼표 없이 하나만 입력해주세요.")
+    if action == "set_correct":
+        positions = parse_correct_labels(value)
+
+    ids = list(dict.fromkeys(int(qid) for qid in question_ids))
+    results = {}
+    cur = con.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        existing = set()
+        for chunk in _chunks(ids):
+            cur.execute(f"SELECT question_id FROM Question WHERE question_id IN ({_in_clause(chunk)})", chunk)
+            existing.update(row[0] for row in cur.fetchall())
+        for qid in ids:
+            if qid not in existing:
+                results[qid] = "not_found"
+        targets = [qid for qid in ids if qid in existing]
+
+        if action in ("set_topic", "clear_topic", "flag_error", "unflag_error"):
+            column, new_value = {
+                "set_topic": ("topic", value),
+                "clear_topic": ("topic", None),
+                "flag_error": ("has_error", 1),
+                "unflag_error": ("has_error", 0),
+            }[action]
+            for chunk in _chunks(targets):
+                cur.execute(
+                    f"SELECT question_id FROM Question WHERE question_id IN ({_in_clause(chunk)}) "
+                    f"AND {column} IS ?", chunk + [new_value]
+                )
+                for row in cur.fetchall():
+                    results[row[0]] = "unchanged"
+                cur.execute(
+                    f"UPDATE Question SET {column} = ? WHERE question_id IN ({_in_clause(chunk)}) "
+                    f"AND {column} IS NOT ?", [new_value] + chunk + [new_value]
+                )
+
+        elif action in ("add_tag", "remove_tag"):
+            updates = []
+            for chunk in _chunks(targets):
+                cur.execute(f"SELECT question_id, tags FROM Question WHERE question_id IN ({_in_clause(chunk)})", chunk)
+                for qid, tags in cur.fetchall():
+                    tag_list = split_tags(tags)
+                    if action == "add_tag" and value not in tag_list:
+                        tag_list.append(value)
+                    elif action == "remove_tag" and value in tag_list:
+                        tag_list.remove(value)
+                    else:
+                        results[qid] = "unchanged"
+                        continue
+                    updates.append((",".join(tag_list) or None, qid))
+            cur.executemany("UPDATE Question SET tags = ? WHERE question_id = ?", updates)
+
+        elif action == "set_correct":
+            choices_by_qid = {}
+            for chunk in _chunks(targets):
+                cur.execute(
+                    f"SELECT question_id, choice_id, is_correct FROM Choice WHERE question_id IN ({_in_clause(chunk)}) "
+                    "ORDER BY question_id, choice_id", chunk
+                )
+                for qid, choice_id, is_correct in cur.fetchall():
+                    choices_by_qid.setdefault(qid, []).append((choice_id, bool(is_correct)))
+            updates = []
+            for qid in targets:
+                choices = choices_by_qid.get(qid, [])
+                choice_ids = [choice_id for choice_id, _ in choices]
+                if positions[-1] >= len(choice_ids):
+                    results[qid] = "invalid"
+                    continue
+                correct_ids = {choice_ids[p] for p in positions}
+                if {choice_id for choice_id, is_correct in choices if is_correct} == correct_ids:
+                    results[qid] = "unchanged"
+                    continue
+                updates.extend((cid in correct_ids, cid) for cid in choice_ids)
+            cur.executemany("UPDATE Choice SET is_correct = ? WHERE choice_id = ?", updates)
+
+        elif action == "delete":
+            for chunk in _chunks(targets):
+                cur.execute(f"DELETE FROM Choice WHERE question_id IN ({_in_clause(chunk)})", chunk)
+                cur.execute(f"DELETE FROM Question WHERE question_id IN ({_in_clause(chunk)})", chunk)
+
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+    for qid in targets:
+        results.setdefault(qid, "ok")
+    return results
@@ -0,0 +1,34 @@
+"""앱 설정 기본값.
+
+create_app() 이 이 값을 먼저 읽고, EXAM_ 로 시작하는 환경 변수(예: EXAM_DB_PATH,
+EXAM_WARM_UP=false)와 create_app(config) 로 넘긴 dict 순서로 덮어씁니다.
+maintenance.py, textstore.py 같은 CLI 는 load_config() 로 같은 값을 읽습니다.
+"""
+import os
+
+import flask
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DEV_SECRET_KEY = "dev-only-insecure-key"   # DEBUG/TESTING 에서 SECRET_KEY 가 없을 때만 씀
+
+
+class Config:
+    SECRET_KEY = None               # 운영에서는 EXAM_SECRET_KEY 로 꼭 지정 (없으면 create_app 이 거부)
+    DB_PATH = os.path.join(BASE_DIR, "data", "my_database.db")
+    SHARD_DIR = os.path.join(BASE_DIR, "data", "learners")
+    ARCHIVE_DIR = os.path.join(BASE_DIR, "data", "archive")    # 유지보수 스케줄러의 AnswerLog 보관 위치
+    BACKUP_DIR = os.path.join(BASE_DIR, "data", "backups")     # 유지보수 스케줄러의 백업 위치
+    SHARD_POOL_SIZE = 32
+    WARM_UP = True                  # 요청을 받기 전에 주제 트리/문제 인덱스/정답표를 미리 만듦
+    MAINTENANCE_SCHEDULER = False   # True 면 create_app 에서 DB 유지보수 스케줄러를 띄움
+    ADMISSION_CONCURRENCY = 4       # 쓰기 라우트별 동시 처리 수
+    ADMISSION_QUEUE_SIZE = 64       # 라우트별 최대 대기 요청 수 (넘으면 바로 503)
+    ADMISSION_TIMEOUT_SEC = 5.0     # 대기열에서 기다리는 최대 시간
+
+
+def load_config():
+    """앱 밖(CLI)에서 create_app 과 같은 순서로 설정을 읽습니다: Config < EXAM_* 환경 변수."""
+    config = flask.Config(BASE_DIR)
+    config.from_object(Config)
+    config.from_prefixed_env("EXAM")
+    return config
@@ -0,0 +1,316 @@
+"""데이터베이스 유지보수 도구.
+
+사용법:
+    python maintenance.py analyze   # 통계 갱신 (PRAGMA optimize / ANALYZE)
+    python maintenance.py vacuum    # auto_vacuum=INCREMENTAL 전환 후 빈 페이지를 조금씩 회수
+    python maintenance.py archive   # 오래된 AnswerLog를 월별 압축 파일로 보관
+    python maintenance.py backup    # SQLite backup API로 온라인 백업
+    python maintenance.py all       # 위 작업을 모두 한 번 실행
+    python maintenance.py daemon    # 낮은 우선순위로 주기적으로 실행
+
+공유 문제은행 DB와 data/learners/ 아래의 학습자별 샤드를 모두 처리합니다.
+AnswerLog 보관은 학습자 샤드에서만 이루어집니다.
+app.py를 직접 실행하면 같은 작업이 백그라운드 스레드(start_scheduler)로도 돌아갑니다.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+from config import Config, load_config
+from shards import STATS_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# --- ⚙️ 설정 ---
+# 경로 기본값은 config.Config 를 따릅니다. CLI(main)는 EXAM_* 환경 변수까지 반영한 load_config() 를 씁니다.
+DB_PATH = Config.DB_PATH
+SHARD_DIR = Config.SHARD_DIR
+ARCHIVE_DIR = Config.ARCHIVE_DIR
+BACKUP_DIR = Config.BACKUP_DIR
+
+ARCHIVE_KEEP_MONTHS = 6      # 최근 N개월의 AnswerLog는 원본 테이블에 그대로 둡니다.
+VACUUM_STEP_PAGES = 256      # incremental_vacuum 한 번에 회수할 페이지 수
+VACUUM_PAUSE_SEC = 0.05      # 단계 사이 쉬는 시간 (시험 요청이 끼어들 틈)
+BACKUP_STEP_PAGES = 1024     # backup 한 단계에서 복사할 페이지 수
+BACKUP_PAUSE_SEC = 0.01
+BACKUP_KEEP = 7              # 보관할 백업 파일 개수
+BUSY_TIMEOUT_SEC = 1         # 유지보수는 양보합니다. 잠겨 있으면 다음 주기로 미룹니다.
+DAEMON_INTERVAL_SEC = 60 * 60
+DAILY_INTERVAL_SEC = 24 * 60 * 60
+NICE_INCREMENT = 10
+
+
+def connect(db_path=DB_PATH):
+    con = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SEC)
+    con.row_factory = sqlite3.Row
+    return con
+
+
+# --- 통계 갱신 ---
+def analyze(con):
+    """쿼리 플래너용 통계를 갱신합니다. 처음에는 ANALYZE, 이후에는 PRAGMA optimize."""
+    con.execute("PRAGMA analysis_limit = 400")
+    has_stats = con.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if has_stats:
+        con.execute("PRAGMA optimize")
+    else:
+        con.execute("ANALYZE")
+    con.commit()
+
+
+# --- 빈 페이지 회수 ---
+def enable_incremental_vacuum(con):
+    """auto_vacuum 모드를 INCREMENTAL로 바꿉니다. 모드 전환에는 전체 VACUUM이 한 번 필요합니다."""
+    mode = con.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode == 2:
+        return False
+    con.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    con.execute("VACUUM")
+    return True
+
+
+def incremental_vacuum(con, step_pages=VACUUM_STEP_PAGES, pause=VACUUM_PAUSE_SEC):
+    """빈 페이지를 step_pages 단위로 조금씩 반환합니다. 회수한 페이지 수를 돌려줍니다."""
+    freed = 0
+    while True:
+        free_pages = con.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages == 0:
+            break
+        step = min(step_pages, free_pages)
+        # fetchall()까지 해야 PRAGMA가 끝까지 실행됩니다.
+        con.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+        freed += step
+        time.sleep(pause)
+    return freed
+
+
+# --- AnswerLog 보관 ---
+def _month_start(month):
+    return f"{month}-01 00:00:00"
+
+
+def _next_month_start(month):
+    year, mon = (int(x) for x in month.split("-"))
+    if mon == 12:
+        year, mon = year + 1, 1
+    else:
+        mon += 1
+    return f"{year:04d}-{mon:02d}-01 00:00:00"
+
+
+def _cutoff_month(keep_months, now=None):
+    now = now or datetime.now(timezone.utc)
+    year, mon = now.year, now.month - keep_months
+    while mon <= 0:
+        year, mon = year - 1, mon + 12
+    return f"{year:04d}-{mon:02d}"
+
+
+def archive_answer_log(con, keep_months=ARCHIVE_KEEP_MONTHS, archive_dir=ARCHIVE_DIR, prefix="answerlog"):
+    """오래된 AnswerLog 행을 월별 집계(AnswerLogMonthly)로 합치고, 원본은 압축 파일로 옮긴 뒤 지웁니다.
+
+    한 달치씩 하나의 트랜잭션으로 처리합니다. 파일을 먼저 기록(fsync)하고 나서 행을 지우므로
+    중간에 실패해도 데이터는 사라지지 않습니다. (최악의 경우 보관 파일에 같은 log_id가 두 번 기록될 수 있습니다.)
+    """
+    con.execute(STATS_SCHEMA)
+    cutoff = _month_start(_cutoff_month(keep_months))
+    months = [
+        row[0] for row in con.execute(
+            "SELECT DISTINCT strftime('%Y-%m', timestamp) FROM AnswerLog WHERE timestamp < ? ORDER BY 1",
+            (cutoff,)
+        ).fetchall()
+        if row[0]
+    ]
+    os.makedirs(archive_dir, exist_ok=True)
+
+    archived = 0
+    for month in months:
+        start, end = _month_start(month), _next_month_start(month)
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            rows = con.execute(
+                "SELECT * FROM AnswerLog WHERE timestamp >= ? AND timestamp < ? ORDER BY log_id",
+                (start, end)
+            ).fetchall()
+            if not rows:
+                con.rollback()
+                continue
+            con.execute(
+                """
+                INSERT INTO AnswerLogMonthly (question_id, month, attempts, correct, confidence_sum, confidence_count)
+                SELECT question_id, ?, COUNT(*), SUM(is_correct),
+                       SUM(CASE WHEN confidence >= 0 THEN confidence ELSE 0 END),
+                       SUM(CASE WHEN confidence >= 0 THEN 1 ELSE 0 END)
+                FROM AnswerLog WHERE timestamp >= ? AND timestamp < ?
+                GROUP BY question_id
+                ON CONFLICT(question_id, month) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    correct = correct + excluded.correct,
+                    confidence_sum = confidence_sum + excluded.confidence_sum,
+                    confidence_count = confidence_count + excluded.confidence_count
+                """,
+                (month, start, end)
+            )
+            # 같은 달이 다시 보관되면 gzip 멤버를 이어 붙입니다. (gzip은 여러 멤버를 하나로 읽습니다.)
+            archive_path = os.path.join(archive_dir, f"{prefix}-{month}.jsonl.gz")
+            with open(archive_path, "ab") as raw, gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                for row in rows:
+                    gz.write((json.dumps(dict(row), ensure_ascii=False) + "\n").encode("utf-8"))
+                gz.flush()
+                raw.flush()
+                os.fsync(raw.fileno())
+            con.execute("DELETE FROM AnswerLog WHERE timestamp >= ? AND timestamp < ?", (start, end))
+            con.commit()
+            archived += len(rows)
+            logger.info("    - %s: %d건 보관 -> %s", month, len(rows), archive_path)
+        except Exception:
+            con.rollback()
+            raise
+    return archived
+
+
+def read_archive(path):
+    """보관 파일의 행들을 dict로 돌려줍니다."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- 온라인 백업 ---
+def backup_database(db_path=DB_PATH, backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """SQLite backup API로 DB를 복사합니다. 단계 사이에 잠금을 풀어 시험 응시를 막지 않습니다."""
+    os.makedirs(backup_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    dest_path = os.path.join(backup_dir, f"{name}-{stamp}.db")
+    with closing(connect(db_path)) as src, closing(sqlite3.connect(dest_path)) as dest:
+        src.backup(dest, pages=BACKUP_STEP_PAGES, sleep=BACKUP_PAUSE_SEC)
+
+    # 'bob' 의 백업을 정리할 때 'bob-2' 의 백업이 섞이지 않도록 이름 전체를 맞춰 봅니다.
+    pattern = re.compile(rf"^{re.escape(name)}-\d{{8}}-\d{{6}}\.db$")
+    old_backups = sorted(f for f in os.listdir(backup_dir) if pattern.match(f))
+    for old in old_backups[:-keep] if keep else []:
+        os.remove(os.path.join(backup_dir, old))
+    return dest_path
+
+
+# --- 실행 묶음 ---
+def maintenance_targets(db_path=DB_PATH, shard_dir=SHARD_DIR):
+    """(DB 경로, 보관 파일 접두사) 목록. 문제은행 DB는 AnswerLog를 보관하지 않으므로 접두사가 None."""
+    targets = [(db_path, None)]
+    if os.path.isdir(shard_dir):
+        for name in sorted(os.listdir(shard_dir)):
+            if name.endswith(".db"):
+                targets.append((os.path.join(shard_dir, name), f"answerlog-{name[:-3]}"))
+    return targets
+
+
+def run_maintenance(db_path=DB_PATH, tasks=("analyze", "vacuum", "archive", "backup"), archive_prefix=None,
+                    archive_dir=ARCHIVE_DIR, backup_dir=BACKUP_DIR):
+    """한 DB에 지정한 작업들을 순서대로 실행합니다. DB가 바쁘면 예외 없이 건너뛰고 False를 돌려줍니다."""
+    logger.info("[maintenance] %s", os.path.basename(db_path))
+    try:
+        with closing(connect(db_path)) as con:
+            if "archive" in tasks and archive_prefix:
+                count = archive_answer_log(con, archive_dir=archive_dir, prefix=archive_prefix)
+                logger.info("[maintenance] AnswerLog %d건 보관 완료", count)
+            if "vacuum" in tasks:
+                if enable_incremental_vacuum(con):
+                    logger.info("[maintenance] auto_vacuum=INCREMENTAL 로 전환했습니다.")
+                freed = incremental_vacuum(con)
+                logger.info("[maintenance] 빈 페이지 %d개 회수", freed)
+            if "analyze" in tasks:
+                analyze(con)
+                logger.info("[maintenance] 통계 갱신 완료")
+        if "backup" in tasks:
+            target_dir = os.path.join(backup_dir, "learners") if archive_prefix else backup_dir
+            logger.info("[maintenance] 백업 생성: %s", backup_database(db_path, target_dir))
+    except sqlite3.OperationalError as e:
+        if "locked" not in str(e) and "busy" not in str(e):
+            raise
+        logger.warning("[maintenance] DB가 사용 중이라 이번 주기는 건너뜁니다: %s", e)
+        return False
+    return True
+
+
+def run_all(db_path=DB_PATH, shard_dir=SHARD_DIR, tasks=("analyze", "vacuum", "archive", "backup"),
+            archive_dir=ARCHIVE_DIR, backup_dir=BACKUP_DIR):
+    """문제은행과 모든 학습자 샤드에 작업을 실행합니다. 모두 성공하면 True."""
+    ok = True
+    for path, prefix in maintenance_targets(db_path, shard_dir):
+        ok = run_maintenance(path, tasks, archive_prefix=prefix, archive_dir=archive_dir, backup_dir=backup_dir) and ok
+    return ok
+
+
+def _lower_priority():
+    """현재 스레드(리눅스) 또는 프로세스의 CPU 우선순위를 낮춥니다."""
+    try:
+        if sys.platform.startswith("linux"):
+            current = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), current + NICE_INCREMENT)
+        elif hasattr(os, "nice"):
+            os.nice(NICE_INCREMENT)
+    except OSError:
+        pass
+
+
+def _scheduler_loop(db_path, shard_dir, interval, stop_event, archive_dir=ARCHIVE_DIR, backup_dir=BACKUP_DIR):
+    _lower_priority()
+    last_daily = 0.0
+    while not stop_event.is_set():
+        tasks = ["analyze", "vacuum"]
+        if time.time() - last_daily >= DAILY_INTERVAL_SEC:
+            tasks += ["archive", "backup"]
+        try:
+            if run_all(db_path, shard_dir, tasks, archive_dir, backup_dir) and "backup" in tasks:
+                last_daily = time.time()
+        except Exception:
+            logger.exception("[maintenance] 오류")
+        stop_event.wait(interval)
+
+
+def start_scheduler(db_path=DB_PATH, shard_dir=SHARD_DIR, interval=DAEMON_INTERVAL_SEC,
+                    archive_dir=ARCHIVE_DIR, backup_dir=BACKUP_DIR):
+    """백그라운드 스레드로 유지보수를 주기 실행합니다. 멈추려면 돌려받은 Event를 set() 하세요."""
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_scheduler_loop, args=(db_path, shard_dir, interval, stop_event, archive_dir, backup_dir),
+        name="db-maintenance", daemon=True
+    )
+    thread.start()
+    return stop_event
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "all"
+    # 라이브러리 함수는 logging 으로 남기므로, CLI 에서는 진행 상황을 화면에 그대로 보여줍니다.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    config = load_config()
+    paths = dict(db_path=config["DB_PATH"], shard_dir=config["SHARD_DIR"],
+                 archive_dir=config["ARCHIVE_DIR"], backup_dir=config["BACKUP_DIR"])
+    if command == "all":
+        run_all(**paths)
+    elif command in ("analyze", "vacuum", "archive", "backup"):
+        run_all(tasks=(command,), **paths)
+    elif command == "daemon":
+        print(f"유지보수 데몬을 시작합니다. (주기: {DAEMON_INTERVAL_SEC}초, DB: {paths['db_path']})")
+        _scheduler_loop(paths["db_path"], paths["shard_dir"], DAEMON_INTERVAL_SEC, threading.Event(),
+                        paths["archive_dir"], paths["backup_dir"])
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 import sqlite3
 import os
 
+import textstore
+
 # --- ⚙️ 설정 ---
 SOURCE_DB_PATH = "22_Diag.db" 
 DEST_DB_PATH = os.path.join("data", "my_database.db")
@@ -51,11 +53,13 @@ def merge_databases():
         print(f"오류: 대상 데이터베이스 '{DEST_DB_PATH}'를 찾을 수 없습니다.")
         return
 
-    source_con = sqlite3.connect(SOURCE_DB_PATH)
-    source_con.row_factory = sqlite3.Row
+    # 압축 저장(textstore)된 DB도 읽을 수 있도록 양쪽 모두 설치합니다.
+    source_con = textstore.install(sqlite3.connect(SOURCE_DB_PATH))
     source_cur = source_con.cursor()
 
-    dest_con = sqlite3.connect(DEST_DB_PATH)
+    dest_con = textstore.install(sqlite3.connect(DEST_DB_PATH))
+    textstore.ensure_schema(dest_con)
+    dest_zdict = textstore.current_dict(dest_con)
     dest_cur = dest_con.cursor()
 
     print(f"'{SOURCE_DB_PATH}'에서 '{DEST_DB_PATH}'로 데이터 병합을 시작합니다.")
@@ -67,8 +71,10 @@ def merge_databases():
     skipped_count = 0
 
     for q_row in source_questions:
-        question_text = q_row["question_text"]
-        dest_cur.execute("SELECT question_id FROM Question WHERE question_text = ?", (question_text,))
+        question_text = textstore.plain(source_con, q_row["question_text"])
+        dest_cur.execute(
+            f"SELECT question_id FROM Question WHERE {textstore.plain_sql('question_text')} = ?", (question_text,)
+        )
         existing_question = dest_cur.fetchone()
 
         # ✨[수정] 중복 발견 시 자동 건너뛰기 대신 사용자에게 확인 요청
@@ -98,12 +104,13 @@ def merge_databases():
         # --- 문제 추가 로직 (중복이 아니거나, 사용자가 강제 추가를 선택한 경우 실행) ---
         dest_cur.execute(
             """
-            INSERT INTO Question (question_text, image_path, subject, topic, answer_explanation, author, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO Question (question_text, question_preview, image_path, subject, topic, answer_explanation, author, tags)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
-                q_row["question_text"], q_row["image_path"], q_row["subject"],
-                q_row["topic"], q_row["answer_explanation"], q_row["author"], q_row["tags"]
+                textstore.pack(dest_con, question_text, dest_zdict), textstore.preview(question_text),
+                q_row["image_path"], q_row["subject"], q_row["topic"],
+                textstore.pack(dest_con, q_row["answer_explanation"], dest_zdict), q_row["author"], q_row["tags"]
             )
         )
         new_question_id = dest_cur.lastrowid
@@ -117,7 +124,8 @@ def merge_databases():
                 INSERT INTO Choice (question_id, choice_text, image_path, is_correct)
                 VALUES (?, ?, ?, ?)
                 """,
-                (new_question_id, c_row["choice_text"], c_row["image_path"], c_row["is_correct"])
+                (new_question_id, textstore.pack(dest_con, c_row["choice_text"], dest_zdict),
+                 c_row["image_path"], c_row["is_correct"])
             )
         
         imported_count += 1
@@ -0,0 +1,107 @@
+"""출제 설계 조립 벤치마크.
+
+가상의 문제은행(기본 10만 문제)을 메모리 DB에 만들고,
+assembly.assemble_exam 과 기존 방식(ORDER BY RANDOM() + 문제별 선택지 조회)의 시간을 비교합니다.
+
+사용법:
+    python scripts/bench_assembly.py [문제 수] [반복 횟수]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import statistics
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import assembly  # noqa: E402
+
+NUM_TOPICS = 50
+CHOICES_PER_QUESTION = 4
+MULTI_ANSWER_RATIO = 0.15
+ERROR_RATIO = 0.02
+ATTEMPTED_RATIO = 0.2
+
+
+def build_bank(num_questions, rng):
+    con = sqlite3.connect(":memory:")
+    con.executescript(
+        """
+        CREATE TABLE Question (question_id INTEGER PRIMARY KEY, question_text TEXT, topic TEXT, has_error BOOLEAN DEFAULT 0);
+        CREATE TABLE Choice (choice_id INTEGER PRIMARY KEY, question_id INTEGER, choice_text TEXT, is_correct BOOLEAN);
+        CREATE INDEX idx_choice_question ON Choice(question_id);
+        """
+    )
+    questions, choices = [], []
+    for qid in range(1, num_questions + 1):
+        questions.append((qid, f"문제 {qid}", f"주제{qid % NUM_TOPICS:02d}", rng.random() < ERROR_RATIO))
+        num_correct = 2 if rng.random() < MULTI_ANSWER_RATIO else 1
+        for i in range(CHOICES_PER_QUESTION):
+            choices.append((qid, f"선택지 {i}", i < num_correct))
+    con.executemany("INSERT INTO Question VALUES (?, ?, ?, ?)", questions)
+    con.executemany("INSERT INTO Choice (question_id, choice_text, is_correct) VALUES (?, ?, ?)", choices)
+    con.commit()
+    return con
+
+
+def build_profile(num_questions, rng):
+    attempted = rng.sample(range(1, num_questions + 1), int(num_questions * ATTEMPTED_RATIO))
+    accuracy = {qid: rng.random() for qid in attempted}
+    recent = set(rng.sample(attempted, min(60, len(attempted))))
+    return assembly.LearnerProfile(accuracy, recent)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(42)
+
+    print(f"문제은행 생성 중... ({num_questions}문제)")
+    con = build_bank(num_questions, rng)
+    profile = build_profile(num_questions, rng)
+
+    start = time.perf_counter()
+    index = assembly.QuestionIndex.load(con)
+    print(f"후보 풀(QuestionIndex) 생성: {(time.perf_counter() - start) * 1000:.1f} ms (서버 시작/문제 수정 시 1회)")
+
+    topics = [f"주제{i:02d}" for i in range(5)]
+    cases = {
+        "주제 5개 x 8문항": {"quotas": {t: 8 for t in topics}},
+        "+ 최근 문제/오류 제외, 복수 정답 10개": {
+            "quotas": {t: 8 for t in topics}, "exclude_recent": True, "exclude_errors": True, "min_multi": 10
+        },
+        "+ 어려운 문제만": {
+            "quotas": {t: 8 for t in topics}, "bands": ["hard"], "exclude_recent": True, "min_multi": 5
+        },
+    }
+    for name, blueprint in cases.items():
+        median, p95 = timed(lambda: assembly.assemble_exam(index, profile, blueprint, rng), repeat)
+        qids, shortfall = assembly.assemble_exam(index, profile, blueprint, rng)
+        print(f"[조립] {name}: 중앙값 {median:.3f} ms, p95 {p95:.3f} ms ({len(qids)}문항, 부족 {shortfall or 0})")
+
+    def legacy():
+        placeholders = ",".join("?" * len(topics))
+        rows = con.execute(
+            f"SELECT * FROM Question WHERE topic IN ({placeholders}) ORDER BY RANDOM() LIMIT ?", topics + [40]
+        ).fetchall()
+        for row in rows:
+            con.execute("SELECT * FROM Choice WHERE question_id = ?", (row[0],)).fetchall()
+
+    median, p95 = timed(legacy, max(1, repeat // 10))
+    print(f"[기존] ORDER BY RANDOM() 40문항: 중앙값 {median:.3f} ms, p95 {p95:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
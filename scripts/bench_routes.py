@@ -0,0 +1,255 @@
+"""모든 라우트를 Flask test client 로 호출하는 종단 간 벤치마크.
+
+규모(문제 수)별로 가상 DB를 만들고(scripts/gen_synthetic_db.py), 라우트마다
+지연 시간(중앙값/p95), 요청당 SQL 문 수, 요청당 최대 메모리 할당량을 잰 뒤 JSON 으로 저장합니다.
+생성한 DB는 bench_data/ 에 캐시해 두고, 실행할 때마다 임시 폴더로 복사해서 씁니다.
+
+사용법:
+    python scripts/bench_routes.py                          # 1k / 10k / 100k
+    python scripts/bench_routes.py --scales 1000 --repeat 3
+    python scripts/bench_routes.py --compare bench_results/routes-20260101-120000.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+
+# --- SQL 문 세기: 앱이 여는 모든 연결에 trace callback 을 겁니다. (app import 전에 설정) ---
+_query_count = 0
+_real_connect = sqlite3.connect
+
+
+def _count_statement(_sql):
+    global _query_count
+    _query_count += 1
+
+
+def _counting_connect(*args, **kwargs):
+    con = _real_connect(*args, **kwargs)
+    con.set_trace_callback(_count_statement)
+    return con
+
+
+sqlite3.connect = _counting_connect
+
+import gen_synthetic_db  # noqa: E402
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+CACHE_DIR = os.path.join(BASE, "bench_data")
+RESULT_DIR = os.path.join(BASE, "bench_results")
+END_DATE = "2026-01-01"
+
+
+def prepare_data(scale, seed, workdir):
+    """규모별 가상 DB를 캐시에서 가져오거나 새로 만들고, 작업 폴더로 복사합니다."""
+    cache = os.path.join(CACHE_DIR, f"q{scale}-seed{seed}")
+    if not os.path.exists(os.path.join(cache, "params.json")):
+        gen_synthetic_db.main([
+            "--out", cache, "--questions", str(scale), "--seed", str(seed),
+            "--end-date", END_DATE, "--image-dir", "synthetic",
+        ])
+    target = os.path.join(workdir, f"q{scale}")
+    shutil.copytree(cache, target)
+    return os.path.join(target, "my_database.db"), os.path.join(target, "learners")
+
+
+def configure_app(db_path, shard_dir):
+    from app import create_app
+    return create_app({"DB_PATH": db_path, "SHARD_DIR": shard_dir, "TESTING": True})
+
+
+def pick_ids(db_path, shard_dir):
+    con = _real_connect(db_path)
+    question_id = con.execute("SELECT MAX(question_id) / 2 FROM Question").fetchone()[0]
+    topics = [r[0] for r in con.execute(
+        "SELECT topic FROM Question WHERE topic IS NOT NULL GROUP BY topic ORDER BY COUNT(*) DESC LIMIT 3"
+    )]
+    word = con.execute("SELECT substr(question_text, 1, 2) FROM Question WHERE question_id = ?", (question_id,)).fetchone()[0]
+    con.close()
+    con = _real_connect(os.path.join(shard_dir, "default.db"))
+    session_id = con.execute("SELECT MAX(session_id) FROM TestSession").fetchone()[0]
+    con.close()
+    return question_id, topics, word, session_id
+
+
+def build_scenarios(db_path, shard_dir):
+    """(이름, 준비 함수, 측정할 요청 함수) 목록. 준비 함수는 시간 측정에서 빠집니다."""
+    qid, topics, word, session_id = pick_ids(db_path, shard_dir)
+    exam_form = {"session_name": "벤치마크", "num_questions": "20", "topics": topics}
+    blueprint_form = {
+        "session_name": "설계 벤치마크", "num_questions": "20", "use_blueprint": "1",
+        "quota_topic": topics, "quota_count": ["8", "6", "6"],
+        "bands": ["easy", "medium", "hard", "new"], "exclude_recent": "1", "exclude_errors": "1", "min_multi": "2",
+    }
+    state = {}
+
+    def start_exam(c):
+        c.post("/", data=exam_form)
+        html = c.get("/start").get_data(as_text=True)
+        state["answers"] = {f"q_{q}": "1" for q in re.findall(r'name="q_(\d+)"', html)}
+
+    def nothing(c):
+        pass
+
+    def new_session(c):
+        start_exam(c)
+        location = c.post("/submit", data=state["answers"]).headers["Location"]
+        state["new_session_id"] = re.search(r"/history/(\d+)", location).group(1)
+
+    return [
+        ("GET /", nothing, lambda c: c.get("/")),
+        ("POST / (시험 설정)", nothing, lambda c: c.post("/", data=exam_form)),
+        ("GET /start", lambda c: c.post("/", data=exam_form), lambda c: c.get("/start")),
+        ("GET /start (출제 설계)", lambda c: c.post("/", data=blueprint_form), lambda c: c.get("/start")),
+        ("POST /submit", start_exam, lambda c: c.post("/submit", data=state["answers"])),
+        ("POST /submit (재시도)", nothing, lambda c: c.post("/submit", data=state["answers"])),
+        ("GET /start_review", nothing, lambda c: c.get("/start_review")),
+        ("GET /review_wrong_answers", nothing, lambda c: c.get(f"/review_wrong_answers/{session_id}")),
+        ("POST /review_selected", nothing,
+         lambda c: c.post("/review_selected", data={"session_ids": [session_id, session_id - 1, session_id - 2]})),
+        ("GET /history", nothing, lambda c: c.get("/history")),
+        ("GET /history/<id>", nothing, lambda c: c.get(f"/history/{session_id}")),
+        ("POST /history/edit/<id>", nothing,
+         lambda c: c.post(f"/history/edit/{session_id}", data={"new_name": "이름 변경"})),
+        ("POST /save_note", nothing, lambda c: c.post("/save_note", json={
+            "session_id": session_id, "question_id": qid, "note_text": "벤치마크 노트"})),
+        ("POST /history/delete/<id>", new_session,
+         lambda c: c.post(f"/history/delete/{state['new_session_id']}")),
+        ("GET /manage", nothing, lambda c: c.get("/manage")),
+        ("GET /manage?page=50", nothing, lambda c: c.get("/manage?page=50")),
+        ("GET /manage?q=", nothing, lambda c: c.get("/manage", query_string={"q": word})),
+        ("GET /manage?topic=", nothing, lambda c: c.get("/manage", query_string={"topic": topics[0]})),
+        ("GET /edit/<id>", nothing, lambda c: c.get(f"/edit/{qid}")),
+        ("POST /edit/<id>", nothing, lambda c: c.post(f"/edit/{qid}", data={
+            "question_text": "수정된 문제", "subject": "과목", "topic": topics[0], "tags": "태그",
+            "answer_explanation": "해설"})),
+        ("POST /quick_edit/<id>", nothing,
+         lambda c: c.post(f"/quick_edit/{qid}", data={"topic": topics[0], "tags": "빠른수정"})),
+        ("POST /report_error/<id>", nothing, lambda c: c.post(f"/report_error/{qid}")),
+        ("POST /bulk_action (ID 100개)", nothing, lambda c: c.post("/bulk_action", json={
+            "action": "add_tag", "value": "벤치", "question_ids": list(range(qid, qid + 100))})),
+        ("POST /bulk_action (주제 전체)", nothing, lambda c: c.post("/bulk_action", json={
+            "action": "flag_error", "filters": {"topic": topics[-1]}})),
+        ("GET /add", nothing, lambda c: c.get("/add")),
+        ("POST /add", nothing, lambda c: c.post("/add", data={
+            "question_text": "새 문제", "subject": "과목", "topic": topics[0], "tags": "",
+            "answer_explanation": "", "choice1_text": "가", "choice2_text": "나", "is_correct": "choice1"})),
+        ("POST /learner", nothing, lambda c: c.post("/learner", data={"learner_id": "default"})),
+    ]
+
+
+def measure(client, prepare, request, repeat):
+    global _query_count
+    prepare(client)
+    request(client)  # 템플릿 컴파일/캐시 생성 등 첫 호출 비용은 따로 둡니다.
+
+    latencies, queries, statuses = [], [], set()
+    for _ in range(repeat):
+        prepare(client)
+        _query_count = 0
+        start = time.perf_counter()
+        response = request(client)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(_query_count)
+        statuses.add(response.status_code)
+
+    prepare(client)
+    tracemalloc.start()
+    request(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "median_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+        "queries": round(statistics.mean(queries), 1),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "status": sorted(statuses),
+    }
+
+
+def run(scales, repeat, seed):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            print(f"\n=== 문제 {scale:,}개 ===")
+            db_path, shard_dir = prepare_data(scale, seed, workdir)
+            app = configure_app(db_path, shard_dir)
+            client = app.test_client()
+            results[str(scale)] = {}
+            for name, prepare, request in build_scenarios(db_path, shard_dir):
+                stats = measure(client, prepare, request, repeat)
+                results[str(scale)][name] = stats
+                print(f"{name:<32} {stats['median_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                      f"SQL {stats['queries']:>7}  메모리 {stats['peak_alloc_kb']:>9.1f} KB  {stats['status']}")
+            app.extensions["shard_pool"].close_all()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)["results"]
+    print(f"\n=== 이전 결과와 비교: {previous_path} ===")
+    for scale, routes in current.items():
+        for name, stats in routes.items():
+            old = previous.get(scale, {}).get(name)
+            if not old:
+                continue
+            ratio = stats["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+            flag = "  ⚠️ 느려짐" if ratio > 1.2 else ""
+            print(f"[{scale}] {name:<32} {old['median_ms']:>9.2f} -> {stats['median_ms']:>9.2f} ms "
+                  f"(x{ratio:.2f}), SQL {old['queries']} -> {stats['queries']}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="라우트별 종단 간 벤치마크")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="문제 수 목록")
+    parser.add_argument("--repeat", type=int, default=5, help="라우트당 측정 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="결과 JSON 경로 (기본값: bench_results/routes-<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.repeat, args.seed)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULT_DIR, f"routes-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""서버 시작 시간과 첫 요청 지연 시간 벤치마크.
+
+매번 새 파이썬 프로세스에서 app 을 import 하고 create_app() 을 호출한 뒤 첫 요청을 보냅니다.
+워밍업(EXAM_WARM_UP)을 켰을 때와 껐을 때를 비교합니다.
+가상 DB는 scripts/bench_routes.py 와 같은 bench_data/ 캐시를 씁니다.
+
+사용법:
+    python scripts/bench_startup.py                       # 문제 10만 개, 5회
+    python scripts/bench_startup.py --scale 10000 --repeat 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ("import_ms", "create_app_ms", "GET /", "POST /submit")
+
+
+def child(db_path, shard_dir):
+    """새 프로세스 안에서 실행: import / create_app / 첫 요청 시간을 JSON 으로 출력합니다."""
+    started = time.perf_counter()
+    sys.path.insert(0, BASE)
+    from app import create_app
+    imported = time.perf_counter()
+    app = create_app({"DB_PATH": db_path, "SHARD_DIR": shard_dir, "TESTING": True})
+    created = time.perf_counter()
+
+    client = app.test_client()
+    timings = {
+        "import_ms": (imported - started) * 1000,
+        "create_app_ms": (created - imported) * 1000,
+    }
+    start = time.perf_counter()
+    client.get("/")
+    timings["GET /"] = (time.perf_counter() - start) * 1000
+    with client.session_transaction() as sess:
+        sess["current_exam"] = list(range(1, 21))
+    start = time.perf_counter()
+    client.post("/submit", data={f"q_{i}": "1" for i in range(1, 21)})
+    timings["POST /submit"] = (time.perf_counter() - start) * 1000
+    print(json.dumps(timings))
+
+
+def run_once(db_path, shard_dir, warm_up):
+    env = dict(os.environ, EXAM_WARM_UP="true" if warm_up else "false")
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), "--child", db_path, shard_dir], env=env, text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="서버 시작/첫 요청 벤치마크")
+    parser.add_argument("--scale", type=int, default=100_000, help="문제 수")
+    parser.add_argument("--repeat", type=int, default=5, help="모드별 프로세스 실행 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", nargs=2, metavar=("DB_PATH", "SHARD_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(*args.child)
+        return
+
+    sys.path.insert(0, os.path.join(BASE, "scripts"))
+    from bench_routes import prepare_data
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path, shard_dir = prepare_data(args.scale, args.seed, workdir)
+        print(f"=== 문제 {args.scale:,}개, 모드별 {args.repeat}회 ===")
+        for warm_up in (False, True):
+            samples = [run_once(db_path, shard_dir, warm_up) for _ in range(args.repeat)]
+            label = "워밍업 켬" if warm_up else "워밍업 끔"
+            parts = [f"{key} {statistics.median(s[key] for s in samples):8.1f}" for key in COLUMNS]
+            print(f"[{label}] " + "  ".join(parts) + "  (ms, 중앙값)")
+
+
+if __name__ == "__main__":
+    main()
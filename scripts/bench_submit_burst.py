@@ -0,0 +1,155 @@
+"""시험 종료 순간의 제출 폭주 부하 테스트.
+
+학습자 여러 명이 시험지를 받아 둔 뒤, 모든 클라이언트가 동시에(기본 200개) /submit 을 보냅니다.
+각 클라이언트는 exam.html 의 스크립트처럼 503 을 받으면 Retry-After 만큼 기다렸다가 같은 제출 토큰으로
+다시 보내고, --duplicates 를 주면 같은 시험지를 두 번 동시에 보냅니다(중복 클릭).
+끝나면 클라이언트마다 기록이 정확히 하나씩 생겼는지(유실/중복 0건) 확인합니다.
+
+사용법:
+    python scripts/bench_submit_burst.py
+    python scripts/bench_submit_burst.py --clients 200 --learners 20 --duplicates
+    python scripts/bench_submit_burst.py --concurrency 1000    # 사실상 입장 제어 없이
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+import statistics
+from collections import Counter
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+sys.path.insert(0, os.path.join(BASE, "scripts"))
+
+MAX_ATTEMPTS = 20
+
+
+def start_exams(app, clients, learners):
+    """클라이언트마다 학습자를 정하고 시험지를 받아 둡니다. [(client, learner_id, form)]"""
+    prepared = []
+    for i in range(clients):
+        client = app.test_client()
+        learner_id = f"burst{i % learners:03d}"
+        client.post("/learner", data={"learner_id": learner_id})
+        client.post("/", data={"session_name": f"동시 제출 {i}", "num_questions": "20"})
+        html = client.get("/start").get_data(as_text=True)
+        form = {"submit_token": re.search(r'name="submit_token" value="([^"]+)"', html).group(1)}
+        for qid in dict.fromkeys(re.findall(r'name="q_(\d+)"', html)):
+            form[f"q_{qid}"] = "1"
+        prepared.append((client, learner_id, form))
+    return prepared
+
+
+def clone_client(app, client):
+    """같은 세션 쿠키를 가진 두 번째 클라이언트 (중복 클릭 흉내)."""
+    twin = app.test_client()
+    twin.set_cookie("session", client.get_cookie("session").value)
+    return twin
+
+
+def submit_with_retry(client, form, barrier, outcome):
+    barrier.wait()
+    started = time.perf_counter()
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        response = client.post("/submit", data=form, headers={"Accept": "application/json"})
+        outcome["statuses"].append(response.status_code)
+        if response.status_code == 503:
+            time.sleep(int(response.headers.get("Retry-After", "1")))
+            continue
+        break
+    outcome["attempts"] = attempt
+    outcome["latency_ms"] = (time.perf_counter() - started) * 1000
+    location = response.get_json()["location"] if response.status_code == 200 else ""
+    match = re.search(r"/history/(\d+)", location)
+    outcome["session_id"] = int(match.group(1)) if match else None
+
+
+def count_sessions(shard_dir):
+    counts = {}
+    for name in os.listdir(shard_dir):
+        if name.endswith(".db"):
+            con = sqlite3.connect(os.path.join(shard_dir, name))
+            counts[name[:-3]] = con.execute("SELECT COUNT(*) FROM TestSession").fetchone()[0]
+            con.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 제출 부하 테스트")
+    parser.add_argument("--clients", type=int, default=200, help="동시에 제출하는 클라이언트 수")
+    parser.add_argument("--learners", type=int, default=20, help="학습자 수 (클라이언트를 나눠 가짐)")
+    parser.add_argument("--scale", type=int, default=1000, help="문제 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicates", action="store_true", help="클라이언트마다 같은 제출을 두 번 동시에 보냄")
+    parser.add_argument("--concurrency", type=int, help="ADMISSION_CONCURRENCY (기본값: config.py)")
+    parser.add_argument("--queue-size", type=int, help="ADMISSION_QUEUE_SIZE (기본값: config.py)")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from bench_routes import prepare_data
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path, shard_dir = prepare_data(args.scale, args.seed, workdir)
+        config = {"DB_PATH": db_path, "SHARD_DIR": shard_dir, "TESTING": True}
+        if args.concurrency:
+            config["ADMISSION_CONCURRENCY"] = args.concurrency
+        if args.queue_size:
+            config["ADMISSION_QUEUE_SIZE"] = args.queue_size
+        app = create_app(config)
+
+        print(f"시험지 준비 중... (클라이언트 {args.clients}, 학습자 {args.learners})")
+        prepared = start_exams(app, args.clients, args.learners)
+        before = count_sessions(shard_dir)
+
+        jobs = []
+        for index, (client, learner_id, form) in enumerate(prepared):
+            jobs.append((index, learner_id, client, form))
+            if args.duplicates:
+                jobs.append((index, learner_id, clone_client(app, client), form))
+        barrier = threading.Barrier(len(jobs))
+        outcomes = [{"client": index, "learner": learner_id, "statuses": []} for index, learner_id, _, _ in jobs]
+        threads = [
+            threading.Thread(target=submit_with_retry, args=(client, form, barrier, outcome))
+            for (_, _, client, form), outcome in zip(jobs, outcomes)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        after = count_sessions(shard_dir)
+        app.extensions["shard_pool"].close_all()
+
+    # --- 검증 ---
+    sessions_by_client = {}
+    for outcome in outcomes:
+        sessions_by_client.setdefault(outcome["client"], set()).add(outcome["session_id"])
+    lost = [c for c, ids in sessions_by_client.items() if None in ids]
+    split = [c for c, ids in sessions_by_client.items() if len(ids - {None}) > 1]
+    expected = Counter(learner for _, learner, _ in prepared)
+    created = {learner: after.get(learner, 0) - before.get(learner, 0) for learner in expected}
+    duplicated = sum(max(0, created[learner] - expected[learner]) for learner in expected)
+    missing = sum(max(0, expected[learner] - created[learner]) for learner in expected)
+
+    statuses = Counter(s for outcome in outcomes for s in outcome["statuses"])
+    latencies = sorted(outcome["latency_ms"] for outcome in outcomes)
+    print(f"\n요청 {len(outcomes)}개, 전체 {elapsed:.2f}초")
+    print(f"응답 코드: {dict(sorted(statuses.items()))}")
+    print(f"재시도한 요청: {sum(1 for o in outcomes if o['attempts'] > 1)}개, "
+          f"최대 시도 {max(o['attempts'] for o in outcomes)}회")
+    print(f"완료까지 걸린 시간: 중앙값 {statistics.median(latencies):.0f} ms, "
+          f"p95 {latencies[max(0, int(len(latencies) * 0.95) - 1)]:.0f} ms, 최대 {latencies[-1]:.0f} ms")
+    print(f"유실: {len(lost) + missing}건, 중복 기록: {duplicated}건, 서로 다른 기록을 받은 중복 제출: {len(split)}건")
+    ok = not lost and not missing and not duplicated and not split and 500 not in statuses
+    print("결과: " + ("통과" if ok else "실패"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""문제 일괄 편집(bulk_ops / /bulk_action)의 문제별 결과를 확인하는 점검 스크립트.
+
+임시 DB에 문제 몇 개를 만들고 작업마다 두 번씩 적용해, 처음엔 ok / 두 번째엔 unchanged 가 나오는지,
+없는 문제는 not_found, 잘못된 입력은 ValueError(라우트에서는 400)가 되는지 확인합니다.
+
+사용법:
+    python scripts/check_bulk_ops.py
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+import bulk_ops  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE Question (question_id INTEGER PRIMARY KEY, question_text TEXT, image_path TEXT, subject TEXT,
+                       topic TEXT, answer_explanation TEXT, author TEXT, tags TEXT, has_error BOOLEAN DEFAULT 0);
+CREATE TABLE Choice (choice_id INTEGER PRIMARY KEY, question_id INTEGER, choice_text TEXT, image_path TEXT,
+                     is_correct BOOLEAN);
+"""
+
+failures = []
+
+
+def check(name, actual, expected):
+    mark = "OK " if actual == expected else "실패"
+    print(f"[{mark}] {name}: {actual}")
+    if actual != expected:
+        failures.append(f"{name}: 기대값 {expected}, 실제 {actual}")
+
+
+def build_bank(path):
+    con = sqlite3.connect(path)
+    con.executescript(SCHEMA)
+    for qid in (1, 2, 3):
+        con.execute("INSERT INTO Question (question_id, question_text, subject, topic, tags) VALUES (?, ?, ?, ?, ?)",
+                    (qid, f"문제 {qid}", "과목", "주제", "기존"))
+        for i in range(3):
+            con.execute("INSERT INTO Choice (question_id, choice_text, is_correct) VALUES (?, ?, ?)",
+                        (qid, f"선택지 {i}", i == 0))
+    con.commit()
+    return con
+
+
+def check_bulk_ops(con):
+    ids = [1, 2, 3]
+    twice = {
+        "flag_error": None, "unflag_error": None, "set_topic": "새 주제", "clear_topic": None,
+        "add_tag": "태그", "remove_tag": "태그", "set_correct": "B",
+    }
+    for action, value in twice.items():
+        check(f"{action} 1회", bulk_ops.apply_bulk_action(con, action, ids, value), dict.fromkeys(ids, "ok"))
+        check(f"{action} 2회", bulk_ops.apply_bulk_action(con, action, ids, value), dict.fromkeys(ids, "unchanged"))
+
+    check("없는 문제", bulk_ops.apply_bulk_action(con, "flag_error", [1, 99]), {99: "not_found", 1: "ok"})
+    check("없는 선택지를 정답으로", bulk_ops.apply_bulk_action(con, "set_correct", [2], "F"), {2: "invalid"})
+    for action, value in [("set_topic", 5), ("set_topic", ""), ("add_tag", "a,b"), ("set_correct", "Z")]:
+        try:
+            bulk_ops.apply_bulk_action(con, action, ids, value)
+            check(f"{action}({value!r}) 거부", "통과됨", "ValueError")
+        except ValueError:
+            check(f"{action}({value!r}) 거부", "ValueError", "ValueError")
+    check("삭제", bulk_ops.apply_bulk_action(con, "delete", [3]), {3: "ok"})
+    check("삭제 후 다시", bulk_ops.apply_bulk_action(con, "delete", [3]), {3: "not_found"})
+
+
+def check_route(db_path, shard_dir):
+    from app import create_app
+    app = create_app({"DB_PATH": db_path, "SHARD_DIR": shard_dir, "TESTING": True, "WARM_UP": False})
+    client = app.test_client()
+    bad_bodies = [
+        {"action": "set_topic", "value": 5, "question_ids": [1]},
+        {"action": "set_topic", "value": "", "question_ids": [1]},
+        {"action": "flag_error", "filters": "주제"},
+        {"action": "flag_error", "filters": {"topic": ["주제"]}},
+        {"action": "flag_error", "question_ids": 1},
+        {"action": ["flag_error"], "question_ids": [1]},
+        ["flag_error"],
+    ]
+    for body in bad_bodies:
+        check(f"POST /bulk_action {body}", client.post("/bulk_action", json=body).status_code, 400)
+    # 1번은 앞에서 오류 표시된 상태, 2번은 아님 (3번은 삭제됨)
+    response = client.post("/bulk_action", json={"action": "unflag_error", "filters": {"topic": "새 주제"}})
+    check("필터 전체 적용", (response.status_code, response.get_json()["summary"]), (200, {"ok": 1, "unchanged": 1}))
+    app.extensions["shard_pool"].close_all()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bank.db")
+        con = build_bank(db_path)
+        check_bulk_ops(con)
+        con.execute("UPDATE Question SET topic = '새 주제'")
+        con.commit()
+        con.close()
+        check_route(db_path, os.path.join(workdir, "learners"))
+    if failures:
+        print(f"\n실패 {len(failures)}건:\n  " + "\n  ".join(failures))
+        return 1
+    print("\n모두 통과")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
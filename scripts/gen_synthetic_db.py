@@ -0,0 +1,250 @@
+"""벤치마크/테스트용 가상 데이터베이스 생성기.
+
+같은 seed 로 실행하면 항상 같은 데이터가 만들어집니다.
+결과물은 실제 앱과 같은 구조입니다.
+    <out>/my_database.db        # 문제은행 (Question, Choice)
+    <out>/learners/<id>.db      # 학습자별 응시 기록 (TestSession, UserAnswer, UserNote, WrongAnswer, AnswerLog)
+    static/<image-dir>/*.png    # 문제/선택지 이미지 (--image-ratio > 0 일 때)
+
+사용법:
+    python scripts/gen_synthetic_db.py --questions 10000 --out data/synthetic
+    python app.py 와 함께 쓰려면 DB_PATH/SHARD_DIR 을 <out> 쪽으로 바꿔 실행하세요.
+"""
+import os
+import sys
+import json
+import zlib
+import random
+import sqlite3
+import struct
+import argparse
+from datetime import datetime, timedelta, timezone
+
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE)
+
+from shards import LEARNER_SCHEMA  # noqa: E402
+
+BANK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "Question" (
+    "question_id" INTEGER,
+    "question_text" TEXT,
+    "image_path" TEXT,
+    "subject" TEXT,
+    "topic" TEXT,
+    "answer_explanation" TEXT,
+    "author" TEXT, tags TEXT, has_error BOOLEAN DEFAULT 0,
+    PRIMARY KEY("question_id" AUTOINCREMENT)
+);
+CREATE TABLE IF NOT EXISTS Choice (
+    choice_id INTEGER PRIMARY KEY AUTOINCREMENT, question_id INTEGER,
+    choice_text TEXT, image_path TEXT, is_correct BOOLEAN,
+    FOREIGN KEY (question_id) REFERENCES Question(question_id)
+);
+"""
+
+SUBJECT_WORDS = ["데이터베이스", "운영체제", "네트워크", "자료구조", "알고리즘", "소프트웨어공학",
+                 "해부학", "생리학", "약리학", "병리학", "미생물학", "진단검사", "영상의학", "보건법규"]
+TOPIC_WORDS = ["정규화", "트랜잭션", "인덱스", "스케줄링", "교착상태", "가상메모리", "라우팅", "혼잡제어",
+               "정렬", "탐색", "그래프", "동적계획법", "요구분석", "테스트", "순환계", "호흡계", "신경계",
+               "내분비", "항생제", "진통제", "염증", "종양", "세균", "바이러스", "혈액검사", "소변검사",
+               "CT", "MRI", "의료법", "감염병예방법"]
+SENTENCE_ENDINGS = ["것은?", "옳은 것은?", "옳지 않은 것은?", "가장 적절한 것은?", "모두 고르시오."]
+
+
+def hangul_word(rng, min_len=2, max_len=4):
+    """임의의 한글 음절로 단어를 만듭니다."""
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(min_len, max_len)))
+
+
+def korean_sentence(rng, words, num_words):
+    parts = []
+    for _ in range(num_words):
+        parts.append(rng.choice(words) if rng.random() < 0.3 else hangul_word(rng))
+    return " ".join(parts)
+
+
+def tiny_png(rgb):
+    """단색 8x8 PNG 바이트를 만듭니다."""
+    width = height = 8
+    raw = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def write_images(rng, image_dir, count):
+    """static/ 아래에 이미지를 만들고 url_for('static') 에 넣을 상대 경로 목록을 돌려줍니다."""
+    abs_dir = os.path.join(BASE, "static", image_dir)
+    os.makedirs(abs_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        name = f"img_{i:03d}.png"
+        with open(os.path.join(abs_dir, name), "wb") as f:
+            f.write(tiny_png((rng.randrange(256), rng.randrange(256), rng.randrange(256))))
+        paths.append(f"{image_dir}/{name}")
+    return paths
+
+
+def generate_bank(con, args, rng, image_paths):
+    """문제은행을 채우고 문제별 (선택지 ID 목록, 정답 ID 목록) 을 돌려줍니다."""
+    con.executescript(BANK_SCHEMA)
+    subjects = [
+        SUBJECT_WORDS[i % len(SUBJECT_WORDS)] + (str(i // len(SUBJECT_WORDS) + 1) if i >= len(SUBJECT_WORDS) else "")
+        for i in range(args.subjects)
+    ]
+    topics = [
+        (rng.choice(subjects), f"{TOPIC_WORDS[i % len(TOPIC_WORDS)]}-{i // len(TOPIC_WORDS) + 1}")
+        for i in range(args.topics)
+    ]
+    tags = [hangul_word(rng, 2, 3) for _ in range(args.tags)]
+
+    def maybe_image():
+        if image_paths and rng.random() < args.image_ratio:
+            return ",".join(rng.sample(image_paths, rng.randint(1, min(2, len(image_paths)))))
+        return None
+
+    answer_keys = []
+    question_rows, choice_rows = [], []
+    next_choice_id = 1
+    for qid in range(1, args.questions + 1):
+        subject, topic = rng.choice(topics)
+        question_rows.append((
+            qid,
+            korean_sentence(rng, TOPIC_WORDS, rng.randint(8, 40)) + " " + rng.choice(SENTENCE_ENDINGS),
+            maybe_image(),
+            subject,
+            topic if rng.random() > 0.02 else None,   # 주제가 비어 있는 문제도 조금 섞습니다.
+            korean_sentence(rng, TOPIC_WORDS, rng.randint(20, 120)) if rng.random() < 0.8 else None,
+            hangul_word(rng, 2, 3),
+            ",".join(rng.sample(tags, rng.randint(0, min(3, len(tags))))) or None,
+            rng.random() < 0.01,
+        ))
+        num_choices = args.choices
+        num_correct = 2 if rng.random() < args.multi_ratio else 1
+        correct_positions = set(rng.sample(range(num_choices), num_correct))
+        choice_ids, correct_ids = [], []
+        for pos in range(num_choices):
+            is_correct = pos in correct_positions
+            choice_rows.append((
+                next_choice_id, qid, korean_sentence(rng, TOPIC_WORDS, rng.randint(2, 12)),
+                maybe_image() if rng.random() < 0.3 else None, is_correct
+            ))
+            choice_ids.append(next_choice_id)
+            if is_correct:
+                correct_ids.append(next_choice_id)
+            next_choice_id += 1
+        answer_keys.append((qid, choice_ids, correct_ids))
+
+    con.executemany("INSERT INTO Question VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", question_rows)
+    con.executemany("INSERT INTO Choice VALUES (?, ?, ?, ?, ?)", choice_rows)
+    con.commit()
+    return answer_keys
+
+
+def generate_learner(con, args, rng, answer_keys, now):
+    """한 학습자의 몇 년치 응시 기록을 만듭니다."""
+    con.executescript(LEARNER_SCHEMA)
+    skill = rng.uniform(0.4, 0.9)
+    start = now - timedelta(days=365 * args.years)
+    num_sessions = int(args.years * 52 * args.sessions_per_week)
+    wrong = set()
+    session_rows, answer_rows, log_rows, note_rows = [], [], [], []
+    span = int((now - start).total_seconds())
+    whens = sorted(start + timedelta(seconds=rng.randrange(span)) for _ in range(num_sessions))
+    for session_id, when in enumerate(whens, start=1):
+        picked = rng.sample(answer_keys, min(args.questions_per_session, len(answer_keys)))
+        score = 0
+        for qid, choice_ids, correct_ids in picked:
+            is_correct = rng.random() < skill
+            chosen = correct_ids if is_correct else [rng.choice(choice_ids)]
+            is_correct = set(chosen) == set(correct_ids)
+            confidence = rng.randint(-1, 3)
+            score += is_correct
+            answer_rows.append((session_id, qid, json.dumps(chosen), is_correct, confidence))
+            log_rows.append((qid, is_correct, confidence, when.strftime("%Y-%m-%d %H:%M:%S")))
+            if not is_correct:
+                wrong.add(qid)
+                if rng.random() < 0.1:
+                    note_rows.append((session_id, qid, korean_sentence(rng, TOPIC_WORDS, rng.randint(5, 30))))
+        total = len(picked)
+        session_rows.append((
+            session_id, when.strftime("%Y-%m-%d %H:%M:%S"), score, total,
+            int(round(score * 100.0 / total)) if total else 0, f"{when:%Y-%m-%d} 모의고사"
+        ))
+    con.executemany(
+        "INSERT INTO TestSession (session_id, timestamp, score, total, percent, session_name) VALUES (?, ?, ?, ?, ?, ?)",
+        session_rows
+    )
+    con.executemany(
+        "INSERT INTO UserAnswer (session_id, question_id, chosen_choice_ids, is_correct, confidence) VALUES (?, ?, ?, ?, ?)",
+        answer_rows
+    )
+    con.executemany("INSERT INTO AnswerLog (question_id, is_correct, confidence, timestamp) VALUES (?, ?, ?, ?)", log_rows)
+    con.executemany("INSERT OR IGNORE INTO UserNote (session_id, question_id, note_text) VALUES (?, ?, ?)", note_rows)
+    con.executemany("INSERT INTO WrongAnswer (question_id) VALUES (?)", [(qid,) for qid in sorted(wrong)])
+    con.commit()
+    return len(session_rows), len(answer_rows)
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    bank_path = os.path.join(args.out, "my_database.db")
+    learner_dir = os.path.join(args.out, "learners")
+    if os.path.exists(bank_path):
+        os.remove(bank_path)
+    os.makedirs(learner_dir, exist_ok=True)
+
+    image_paths = write_images(rng, args.image_dir, args.images) if args.image_ratio > 0 else []
+    with sqlite3.connect(bank_path) as con:
+        answer_keys = generate_bank(con, args, rng, image_paths)
+    con.close()
+    print(f"문제은행 생성: {bank_path} ({args.questions}문제, 선택지 {args.questions * args.choices}개)")
+
+    now = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else datetime.now(timezone.utc).replace(tzinfo=None)
+    for i in range(args.learners):
+        learner_id = "default" if i == 0 else f"learner{i:03d}"
+        path = os.path.join(learner_dir, f"{learner_id}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        with sqlite3.connect(path) as con:
+            sessions, answers = generate_learner(con, args, rng, answer_keys, now)
+        con.close()
+        print(f"학습자 생성: {path} (시험 {sessions}회, 답안 {answers}개)")
+
+    with open(os.path.join(args.out, "params.json"), "w", encoding="utf-8") as f:
+        json.dump(vars(args), f, ensure_ascii=False, indent=2)
+    return bank_path, learner_dir
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="가상 문제은행/응시 기록 생성기")
+    parser.add_argument("--out", default=os.path.join(BASE, "data", "synthetic"), help="결과 폴더")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--choices", type=int, default=5, help="문제당 선택지 수")
+    parser.add_argument("--multi-ratio", type=float, default=0.1, help="복수 정답 문제 비율")
+    parser.add_argument("--subjects", type=int, default=6)
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--tags", type=int, default=30)
+    parser.add_argument("--learners", type=int, default=3)
+    parser.add_argument("--years", type=float, default=2, help="응시 기록 기간(년)")
+    parser.add_argument("--sessions-per-week", type=float, default=3)
+    parser.add_argument("--questions-per-session", type=int, default=20)
+    parser.add_argument("--images", type=int, default=20, help="만들 이미지 파일 수")
+    parser.add_argument("--image-ratio", type=float, default=0.1, help="이미지가 붙는 문제 비율")
+    parser.add_argument("--image-dir", default="synthetic", help="static/ 아래 이미지 폴더")
+    parser.add_argument("--end-date", help="응시 기록의 마지막 날짜 (YYYY-MM-DD, 기본값: 오늘). 같은 결과를 원하면 지정하세요.")
+    return parser
+
+
+def main(argv=None):
+    generate(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""학습자별 DB 샤드 관리.
+
+문제은행(Question, Choice)은 공유 DB(data/my_database.db)에 그대로 두고,
+학습자의 응시 기록(AnswerLog, UserAnswer, TestSession, UserNote, WrongAnswer)은
+data/learners/<learner_id>.db 파일에 따로 저장합니다.
+
+샤드 연결은 문제은행을 읽기 전용으로 ATTACH 하므로, 테이블 이름을 바꾸지 않고도
+'SELECT * FROM Question' 같은 기존 쿼리가 그대로 동작합니다. (SQLite는 main -> 첨부 DB 순으로 이름을 찾습니다.)
+학습자마다 파일이 다르므로 서로의 쓰기 잠금을 기다리지 않습니다.
+"""
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import textstore
+
+# --- ⚙️ 설정 ---
+DEFAULT_LEARNER = "default"   # 샤드 도입 전의 기록은 이 학습자에게 옮겨집니다.
+SHARD_POOL_SIZE = 32          # 동시에 열어 둘 샤드 연결 수 (LRU)
+SHARD_TIMEOUT_SEC = 10
+LEARNER_ID_RE = re.compile(r"[\w-]{1,40}")
+
+LEARNER_TABLES = ["TestSession", "UserAnswer", "UserNote", "WrongAnswer", "AnswerLog"]
+
+# 월별 요약 통계 (maintenance.archive_answer_log 가 채웁니다)
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "AnswerLogMonthly" (
+    "question_id" INTEGER NOT NULL,
+    "month" TEXT NOT NULL,            -- 'YYYY-MM'
+    "attempts" INTEGER NOT NULL,
+    "correct" INTEGER NOT NULL,
+    "confidence_sum" INTEGER NOT NULL,
+    "confidence_count" INTEGER NOT NULL,
+    PRIMARY KEY ("question_id", "month")
+)
+"""
+
+LEARNER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "TestSession" (
+    "session_id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "timestamp" DATETIME DEFAULT CURRENT_TIMESTAMP,
+    "score" INTEGER NOT NULL,
+    "total" INTEGER NOT NULL,
+    "percent" INTEGER NOT NULL,
+    "session_name" TEXT
+);
+CREATE TABLE IF NOT EXISTS "UserAnswer" (
+    "answer_id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "session_id" INTEGER NOT NULL,
+    "question_id" INTEGER NOT NULL,
+    "chosen_choice_ids" TEXT,
+    "is_correct" BOOLEAN NOT NULL,
+    "confidence" INTEGER,
+    FOREIGN KEY("session_id") REFERENCES "TestSession"("session_id")
+);
+CREATE INDEX IF NOT EXISTS "idx_useranswer_session" ON "UserAnswer"("session_id");
+CREATE TABLE IF NOT EXISTS "UserNote" (
+    "note_id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "session_id" INTEGER NOT NULL,
+    "question_id" INTEGER NOT NULL,
+    "note_text" TEXT,
+    FOREIGN KEY("session_id") REFERENCES "TestSession"("session_id"),
+    UNIQUE("session_id", "question_id")
+);
+CREATE TABLE IF NOT EXISTS "WrongAnswer" (
+    "wrong_answer_id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "question_id" INTEGER,
+    "timestamp" DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS "AnswerLog" (
+    "log_id" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "question_id" INTEGER NOT NULL,
+    "is_correct" BOOLEAN NOT NULL,
+    "confidence" INTEGER,
+    "timestamp" DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS "idx_answerlog_timestamp" ON "AnswerLog"("timestamp");
+CREATE TABLE IF NOT EXISTS "ShardMeta" (
+    "key" TEXT PRIMARY KEY,
+    "value" TEXT
+);
+CREATE TABLE IF NOT EXISTS "SubmissionToken" (
+    "token" TEXT PRIMARY KEY,
+    "session_id" INTEGER NOT NULL,
+    "created_at" DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+""" + STATS_SCHEMA + ";"
+
+
+def normalize_learner_id(raw):
+    """학습자 ID를 파일 이름으로 쓸 수 있는지 확인합니다. 쓸 수 없으면 None."""
+    learner_id = (raw or "").strip()
+    if not LEARNER_ID_RE.fullmatch(learner_id):
+        return None
+    return learner_id
+
+
+def shard_path(shard_dir, learner_id):
+    return os.path.join(shard_dir, f"{learner_id}.db")
+
+
+def list_shards(shard_dir):
+    """(learner_id, 경로) 목록을 돌려줍니다."""
+    if not os.path.isdir(shard_dir):
+        return []
+    return [
+        (name[:-3], os.path.join(shard_dir, name))
+        for name in sorted(os.listdir(shard_dir)) if name.endswith(".db")
+    ]
+
+
+def _sqlite_uri(path, **params):
+    uri = Path(os.path.abspath(path)).as_uri()
+    if params:
+        uri += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+    return uri
+
+
+def open_shard(bank_path, shard_dir, learner_id):
+    """학습자 샤드를 열고(없으면 만들고) 문제은행을 bank 라는 이름으로 첨부합니다."""
+    os.makedirs(shard_dir, exist_ok=True)
+    path = shard_path(shard_dir, learner_id)
+    con = sqlite3.connect(
+        _sqlite_uri(path), uri=True, timeout=SHARD_TIMEOUT_SEC, check_same_thread=False
+    )
+    textstore.install(con)
+    con.executescript(LEARNER_SCHEMA)
+    con.execute("ATTACH DATABASE ? AS bank", (_sqlite_uri(bank_path, mode="ro"),))
+    if learner_id == DEFAULT_LEARNER:
+        _import_legacy_history(con)
+    return con
+
+
+def _import_legacy_history(con):
+    """샤드 도입 전 문제은행 DB에 쌓여 있던 응시 기록을 기본 학습자 샤드로 한 번만 복사합니다.
+
+    복사 여부는 ShardMeta 의 legacy_imported 로 기록하고, 확인/복사/기록을 한 트랜잭션(BEGIN IMMEDIATE)으로
+    묶어 여러 워커가 동시에 열어도 한 번만 복사됩니다. 중간에 실패하면 다음에 열 때 다시 시도합니다.
+    """
+    if con.execute("SELECT 1 FROM ShardMeta WHERE key = 'legacy_imported'").fetchone():
+        return
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        if con.execute("SELECT 1 FROM ShardMeta WHERE key = 'legacy_imported'").fetchone():
+            con.rollback()
+            return
+        # 표시가 없는데 기록이 있으면 예전 방식으로 이미 복사한 샤드입니다. 표시만 남깁니다.
+        if not con.execute("SELECT 1 FROM main.TestSession LIMIT 1").fetchone():
+            for table in LEARNER_TABLES:
+                bank_cols = {r["name"] for r in con.execute(f'PRAGMA bank.table_info("{table}")')}
+                if not bank_cols:
+                    continue
+                cols = [r["name"] for r in con.execute(f'PRAGMA main.table_info("{table}")') if r["name"] in bank_cols]
+                col_sql = ", ".join(f'"{c}"' for c in cols)
+                con.execute(f'INSERT INTO main."{table}" ({col_sql}) SELECT {col_sql} FROM bank."{table}"')
+        con.execute("INSERT INTO ShardMeta (key, value) VALUES ('legacy_imported', CURRENT_TIMESTAMP)")
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+class _ShardHandle:
+    def __init__(self, con):
+        self.con = con
+        self.lock = threading.Lock()   # 한 연결은 한 번에 한 요청만 사용합니다.
+        self.users = 0                 # 대여 중인 요청 수 (0일 때만 닫을 수 있음)
+
+
+class ShardPool:
+    """학습자 샤드 연결을 LRU로 관리합니다.
+
+    사용법:
+        with pool.connection(learner_id) as con:
+            con.execute(...)
+    """
+
+    def __init__(self, bank_path, shard_dir, capacity=SHARD_POOL_SIZE):
+        self.bank_path = bank_path
+        self.shard_dir = shard_dir
+        self.capacity = capacity
+        self._handles = OrderedDict()
+        self._opening = {}    # learner_id -> Event (그 학습자의 샤드를 여는 중)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, learner_id):
+        handle = self._checkout(learner_id)
+        handle.lock.acquire()
+        try:
+            yield handle.con
+        finally:
+            if handle.con.in_transaction:
+                handle.con.rollback()
+            handle.lock.release()
+            with self._lock:
+                handle.users -= 1
+                self._evict()
+
+    def _checkout(self, learner_id):
+        """풀에서 연결을 빌립니다. 샤드는 풀 잠금 밖에서 열어, 느리게 열리는 샤드가 다른 학습자를 막지 않습니다."""
+        while True:
+            with self._lock:
+                handle = self._handles.get(learner_id)
+                if handle is not None:
+                    self._handles.move_to_end(learner_id)
+                    handle.users += 1
+                    self._evict()
+                    return handle
+                opening = self._opening.get(learner_id)
+                if opening is None:
+                    opening = self._opening[learner_id] = threading.Event()
+                    break
+            opening.wait()   # 같은 학습자의 샤드를 다른 요청이 여는 중 (실패했으면 다시 시도)
+        try:
+            handle = _ShardHandle(open_shard(self.bank_path, self.shard_dir, learner_id))
+            with self._lock:
+                handle.users += 1
+                self._handles[learner_id] = handle
+                self._evict()
+            return handle
+        finally:
+            with self._lock:
+                del self._opening[learner_id]
+            opening.set()
+
+    def _evict(self):
+        """용량을 넘으면 가장 오래 안 쓴, 대여 중이 아닌 연결부터 닫습니다. (self._lock 안에서 호출)"""
+        if len(self._handles) <= self.capacity:
+            return
+        for learner_id in list(self._handles):
+            if len(self._handles) <= self.capacity:
+                break
+            handle = self._handles[learner_id]
+            if handle.users == 0:
+                del self._handles[learner_id]
+                handle.con.close()
+
+    def close_all(self):
+        with self._lock:
+            for handle in self._handles.values():
+                handle.con.close()
+            self._handles.clear()
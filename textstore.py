@@ -0,0 +1,367 @@
+"""긴 텍스트 열(문제/해설/선택지)의 zstd 압축 저장.
+
+문제은행으로 학습한 zstd 사전(TextDict 테이블)으로 긴 값을 BLOB 으로 압축해 둡니다.
+install() 한 연결에서는 압축된 값이 LazyText 로 읽히고, 템플릿이 실제로 출력할 때 처음 풀립니다.
+/manage 같은 목록 화면은 평문으로 저장된 Question.question_preview 만 읽습니다.
+zstandard 가 없으면 새 값은 평문으로 저장합니다. (이미 압축된 DB를 읽으려면 필요합니다)
+학습자 샤드(노트)는 압축하지 않습니다. 사전이 문제은행에 있으므로, 압축하면 샤드와 그 백업을
+같은 문제은행 없이는 읽을 수 없게 됩니다.
+
+사용법:
+    python textstore.py train        # 문제은행 텍스트로 사전 학습
+    python textstore.py compress     # 문제은행의 긴 텍스트 압축 (예전에 압축한 학습자 노트는 평문으로 되돌림)
+    python textstore.py decompress   # 모두 평문으로 되돌림 (zstandard 를 뺄 때)
+    python textstore.py stats        # 압축 현황
+"""
+import sys
+import random
+import sqlite3
+import threading
+from contextlib import closing
+
+from config import load_config
+
+# --- ⚙️ 설정 ---
+MIN_BYTES = 160          # 이보다 짧은(UTF-8 바이트) 값은 압축하지 않음
+PREVIEW_LENGTH = 100     # question_preview 글자 수
+DICT_SIZE = 64 * 1024    # 사전 크기
+SAMPLE_LIMIT = 20000     # 사전 학습에 쓸 최대 표본 수
+LEVEL = 9
+BATCH_SIZE = 1000        # 압축/해제할 때 한 트랜잭션에서 바꿀 행 수
+
+BANK_COLUMNS = [("Question", "question_text"), ("Question", "answer_explanation"), ("Choice", "choice_text")]
+LEARNER_COLUMNS = [("UserNote", "note_text")]   # 압축하지 않음. 예전 압축 값을 되돌리고 현황을 볼 때만 씀
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"   # zstd 프레임 시작 바이트 (UTF-8 텍스트는 이렇게 시작할 수 없음)
+
+TEXT_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS TextDict (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dict_id INTEGER NOT NULL UNIQUE,
+    data BLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TRIGGER IF NOT EXISTS trg_question_preview_insert AFTER INSERT ON Question
+WHEN typeof(NEW.question_text) = 'text'
+BEGIN
+    UPDATE Question SET question_preview = substr(NEW.question_text, 1, {PREVIEW_LENGTH})
+    WHERE question_id = NEW.question_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_question_preview_update AFTER UPDATE OF question_text ON Question
+WHEN typeof(NEW.question_text) = 'text'
+BEGIN
+    UPDATE Question SET question_preview = substr(NEW.question_text, 1, {PREVIEW_LENGTH})
+    WHERE question_id = NEW.question_id;
+END;
+"""
+
+_lock = threading.Lock()
+_dicts = {}                   # dict_id -> ZstdCompressionDict (사전은 만든 뒤 바뀌지 않음)
+_local = threading.local()    # 스레드별 압축기/해제기 (zstandard 객체는 스레드 간 공유 불가)
+_zstd_module = []             # [zstandard 또는 None] - 처음 압축/해제할 때 불러옵니다.
+
+
+class LazyText:
+    """압축된 텍스트 값. 처음 str() 될 때(템플릿 출력 등) 한 번만 풉니다."""
+    __slots__ = ("_data", "_zdict", "_text")
+
+    def __init__(self, data, zdict):
+        self._data = data
+        self._zdict = zdict
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = _decompress(self._data, self._zdict)
+            self._data = self._zdict = None
+        return self._text
+
+    def __len__(self):
+        return len(str(self))
+
+    def __bool__(self):
+        return True   # MIN_BYTES 이상인 값만 압축되므로 빈 문자열일 수 없음
+
+    def __getitem__(self, key):
+        return str(self)[key]
+
+    def __eq__(self, other):
+        return str(self) == (str(other) if isinstance(other, LazyText) else other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __getattr__(self, name):
+        # .split(), .strip() 같은 str 메서드는 푼 문자열로 넘깁니다.
+        return getattr(str(self), name)
+
+    def __repr__(self):
+        return f"LazyText({'풀림' if self._text is not None else f'{len(self._data)} bytes'})"
+
+
+# 다른 쿼리의 파라미터로 넘기면 평문으로 저장됩니다.
+sqlite3.register_adapter(LazyText, str)
+
+
+def _zstd():
+    """zstandard 모듈(선택 의존성). 없으면 None. 앱 import 시간을 늘리지 않도록 처음 쓸 때 불러옵니다."""
+    if not _zstd_module:
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        _zstd_module.append(zstandard)
+    return _zstd_module[0]
+
+
+def _require_zstd():
+    zstandard = _zstd()
+    if zstandard is None:
+        raise RuntimeError("압축된 텍스트를 다루려면 zstandard 패키지가 필요합니다. (pip install zstandard)")
+    return zstandard
+
+
+def is_compressed(value):
+    return isinstance(value, bytes) and value[:4] == ZSTD_MAGIC
+
+
+def _get_dict(con, dict_id):
+    """dict_id 의 사전을 캐시에서 찾고, 없으면 con 에서 읽어 둡니다."""
+    with _lock:
+        zdict = _dicts.get(dict_id)
+    if zdict is None and dict_id:
+        cur = con.cursor()
+        cur.row_factory = None
+        row = cur.execute("SELECT data FROM TextDict WHERE dict_id = ?", (dict_id,)).fetchone()
+        if row is None:
+            raise LookupError(f"압축 사전 {dict_id} 를 찾을 수 없습니다.")
+        zdict = _require_zstd().ZstdCompressionDict(row[0])
+        with _lock:
+            _dicts[dict_id] = zdict
+    return zdict
+
+
+def _codec(kind, zdict):
+    """스레드별로 만들어 두는 압축기("c")/해제기("d")."""
+    zstandard = _require_zstd()
+    codecs = _local.__dict__.setdefault("codecs", {})
+    key = (kind, zdict.dict_id() if zdict else 0)
+    if key not in codecs:
+        if kind == "c":
+            codecs[key] = zstandard.ZstdCompressor(level=LEVEL, dict_data=zdict, write_checksum=False)
+        else:
+            codecs[key] = zstandard.ZstdDecompressor(dict_data=zdict)
+    return codecs[key]
+
+
+def _decompress(data, zdict):
+    return _codec("d", zdict).decompress(data).decode("utf-8")
+
+
+def _wrap(con, value):
+    """압축된 BLOB 을 LazyText 로 감쌉니다. 사전은 읽는 시점에 찾아 둡니다. (연결은 곧 닫힐 수 있음)"""
+    zstandard = _require_zstd()
+    return LazyText(value, _get_dict(con, zstandard.get_frame_parameters(value).dict_id))
+
+
+def row_factory(cursor, row):
+    """sqlite3.Row 와 같지만 압축된 값은 LazyText 로 바꿉니다."""
+    if any(type(v) is bytes for v in row):
+        row = tuple(_wrap(cursor.connection, v) if is_compressed(v) else v for v in row)
+    return sqlite3.Row(cursor, row)
+
+
+def plain(con, value):
+    """저장된 값을 평문 str 로 바꿉니다. (SQL 함수 zt)"""
+    if is_compressed(value):
+        return str(_wrap(con, value))
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def plain_sql(column):
+    """압축 여부와 상관없이 평문으로 비교/검색할 수 있는 SQL 식. (install() 한 연결에서만 사용)"""
+    return f"(CASE WHEN typeof({column}) = 'blob' THEN zt({column}) ELSE {column} END)"
+
+
+def install(con):
+    """연결에 row_factory 와 zt() SQL 함수를 설치합니다."""
+    con.row_factory = row_factory
+    con.create_function("zt", 1, lambda value: plain(con, value), deterministic=True)
+    return con
+
+
+def current_dict(con):
+    """가장 최근에 학습한 사전. 없으면 None."""
+    cur = con.cursor()
+    cur.row_factory = None
+    try:
+        row = cur.execute("SELECT dict_id FROM TextDict ORDER BY id DESC LIMIT 1").fetchone()
+    except sqlite3.OperationalError:   # TextDict 가 없는 DB
+        return None
+    return _get_dict(con, row[0]) if row else None
+
+
+def pack(con, value, zdict=False):
+    """저장할 값을 만듭니다. 길고 사전이 있으면 압축 BLOB, 아니면 평문 str 그대로.
+
+    zdict 를 주지 않으면 값마다 TextDict 를 조회하므로, 여러 값을 저장할 때는 packer() 를 쓰세요.
+    """
+    if value is None:
+        return None
+    text = str(value)
+    raw = text.encode("utf-8")
+    if len(raw) < MIN_BYTES or _zstd() is None:
+        return text
+    if zdict is False:
+        zdict = current_dict(con)
+    if zdict is None:
+        return text
+    data = _codec("c", zdict).compress(raw)
+    return data if len(data) < len(raw) else text
+
+
+def packer(con):
+    """사전을 한 번만 찾아 두고 pack 하는 함수. 요청 하나에서 여러 값을 저장할 때 씁니다."""
+    zdict = current_dict(con) if _zstd() else None
+    return lambda value: pack(con, value, zdict)
+
+
+def preview(value):
+    """Question.question_preview 에 넣을 앞부분."""
+    return str(value)[:PREVIEW_LENGTH] if value is not None else None
+
+
+def ensure_schema(con):
+    """문제은행에 question_preview 열, TextDict 테이블, 미리보기 트리거를 만들고 비어 있는 미리보기를 채웁니다."""
+    columns = {row[1] for row in con.execute("PRAGMA table_info(Question)")}
+    if not columns:   # 아직 초기화하지 않은 DB
+        return
+    if "question_preview" not in columns:
+        con.execute("ALTER TABLE Question ADD COLUMN question_preview TEXT")
+    con.executescript(TEXT_SCHEMA)
+    con.execute(
+        "UPDATE Question SET question_preview = substr(question_text, 1, ?) "
+        "WHERE question_preview IS NULL AND typeof(question_text) = 'text'", (PREVIEW_LENGTH,)
+    )
+    cur = con.cursor()
+    cur.row_factory = None
+    missing = cur.execute(
+        "SELECT question_id, question_text FROM Question WHERE question_preview IS NULL AND typeof(question_text) = 'blob'"
+    ).fetchall()
+    con.executemany("UPDATE Question SET question_preview = ? WHERE question_id = ?",
+                    [(preview(plain(con, text)), qid) for qid, text in missing])
+    con.commit()
+
+
+# --- CLI ---
+def train(con):
+    """문제은행 텍스트 표본으로 사전을 학습해 TextDict 에 추가합니다."""
+    zstandard = _require_zstd()
+    ensure_schema(con)
+    samples = []
+    cur = con.cursor()
+    cur.row_factory = None
+    for table, column in BANK_COLUMNS:
+        rows = cur.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL").fetchall()
+        samples.extend(plain(con, row[0]).encode("utf-8") for row in rows)
+    samples = [s for s in samples if s]
+    if len(samples) > SAMPLE_LIMIT:
+        samples = random.Random(0).sample(samples, SAMPLE_LIMIT)
+    try:
+        zdict = zstandard.train_dictionary(DICT_SIZE, samples, dict_id=random.randrange(1 << 16, 1 << 31), level=LEVEL)
+    except zstandard.ZstdError as e:
+        print(f"사전 학습 실패 (텍스트가 너무 적을 수 있습니다): {e}")
+        return None
+    con.execute("INSERT INTO TextDict (dict_id, data) VALUES (?, ?)", (zdict.dict_id(), zdict.as_bytes()))
+    con.commit()
+    print(f"사전 {zdict.dict_id()} 학습 완료: 표본 {len(samples)}개, {len(zdict.as_bytes()) / 1024:.1f} KB")
+    return zdict
+
+
+def _rewrite(con, columns, convert):
+    """columns 의 값을 convert(value) 로 바꿉니다. BATCH_SIZE 행마다 커밋합니다. 바꾼 행 수를 돌려줍니다."""
+    changed = 0
+    cur = con.cursor()
+    cur.row_factory = None
+    for table, column in columns:
+        last = 0
+        while True:
+            rows = cur.execute(
+                f"SELECT rowid, {column} FROM main.{table} WHERE rowid > ? AND {column} IS NOT NULL "
+                "ORDER BY rowid LIMIT ?", (last, BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            updates = []
+            for rowid, value in rows:
+                new_value = convert(value)
+                if new_value != value:
+                    updates.append((new_value, rowid))
+            con.executemany(f"UPDATE main.{table} SET {column} = ? WHERE rowid = ?", updates)
+            con.commit()
+            changed += len(updates)
+    return changed
+
+
+def compress_db(con, columns, zdict):
+    return _rewrite(con, columns, lambda v: v if is_compressed(v) else pack(con, v, zdict))
+
+
+def decompress_db(con, columns):
+    return _rewrite(con, columns, lambda v: plain(con, v) if is_compressed(v) else v)
+
+
+def stats(con, columns, label=""):
+    for table, column in columns:
+        total, compressed, stored, original = con.execute(
+            f"SELECT COUNT({column}), SUM(typeof({column}) = 'blob'), SUM(length(CAST({column} AS BLOB))), "
+            f"SUM(length(CAST({plain_sql(column)} AS BLOB))) FROM main.{table}"
+        ).fetchone()
+        ratio = (stored or 0) / original if original else 1
+        print(f"{label}{table}.{column}: {compressed or 0}/{total} 압축, "
+              f"{(original or 0) / 1024:.0f} KB -> {(stored or 0) / 1024:.0f} KB ({ratio:.0%})")
+
+
+def _learner_connections(db_path, shard_dir):
+    import shards
+    for learner_id, _path in shards.list_shards(shard_dir):
+        with closing(shards.open_shard(db_path, shard_dir, learner_id)) as con:
+            yield learner_id, install(con)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "stats"
+    if command not in ("train", "compress", "decompress", "stats"):
+        print(__doc__)
+        return 1
+    # 앱과 같은 설정(Config < EXAM_* 환경 변수)의 DB 를 다룹니다.
+    config = load_config()
+    db_path, shard_dir = config["DB_PATH"], config["SHARD_DIR"]
+    with closing(install(sqlite3.connect(db_path))) as bank:
+        ensure_schema(bank)
+        if command == "train":
+            train(bank)
+        elif command == "compress":
+            zdict = current_dict(bank) or train(bank)
+            if zdict is None:
+                return 1
+            print(f"문제은행: {compress_db(bank, BANK_COLUMNS, zdict)}개 값 압축")
+        elif command == "decompress":
+            print(f"문제은행: {decompress_db(bank, BANK_COLUMNS)}개 값 해제")
+        else:
+            stats(bank, BANK_COLUMNS)
+    for learner_id, con in _learner_connections(db_path, shard_dir):
+        if command in ("compress", "decompress"):
+            print(f"{learner_id}: {decompress_db(con, LEARNER_COLUMNS)}개 값 해제")
+        elif command == "stats":
+            stats(con, LEARNER_COLUMNS, f"{learner_id}: ")
+    if command in ("compress", "decompress"):
+        print("빈 페이지는 'python maintenance.py vacuum' 으로 회수할 수 있습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())